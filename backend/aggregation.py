@@ -0,0 +1,257 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.sketch import SketchLayout
+
+# Metric values are split into a part on a 2**-20 grid, whose sums are exact in
+# float64, and a tiny remainder. Summing the two separately keeps cell and
+# rollup sums correctly rounded, so means match a row-level pandas mean even
+# when they sit exactly on a rounding boundary (e.g. 0.08325 -> 4 decimals).
+SPLIT_SCALE = 2.0 ** 20
+
+
+def split_values(values: np.ndarray):
+    hi = np.round(values * SPLIT_SCALE) / SPLIT_SCALE
+    return hi, values - hi
+
+
+class GroupedAggregate:
+    """Dense (sum, count) cells over the joint codes of several group-by columns.
+
+    Any mean, overall or broken down by one of the columns, is a marginal of
+    these cells, so new group-by/metric combinations cost no extra row scan.
+    Rows with a missing group value sit in one extra slot at the end of that
+    dimension: they count toward overall means but are not a labelled group.
+    With a ``SketchLayout``, cells also hold a histogram and the exact min/max
+    per metric, which marginalize the same way into per-group distributions.
+    Histograms are the bulk of the cells, so ``take`` leaves them whole and
+    records ``positions``; a distribution cuts them only after summing away
+    the dimensions nobody filtered on.
+    """
+
+    def __init__(self, sums: np.ndarray, residuals: np.ndarray, counts: np.ndarray, rows: np.ndarray,
+                 dimensions: List[str], labels: Dict[str, List[str]], metrics: List[str],
+                 sketches: Optional[SketchLayout] = None, histograms: Optional[np.ndarray] = None,
+                 mins: Optional[np.ndarray] = None, maxs: Optional[np.ndarray] = None,
+                 positions: Optional[Dict[str, np.ndarray]] = None):
+        self.sums = sums
+        self.residuals = residuals
+        self.counts = counts
+        self.rows = rows
+        self.dimensions = dimensions
+        self.labels = labels
+        self.metrics = metrics
+        self.sketches = sketches
+        self.histograms = histograms
+        self.mins = mins
+        self.maxs = maxs
+        # Label positions per filtered dimension, still to be applied to ``histograms``
+        self.positions = positions or {}
+
+    @property
+    def row_count(self) -> int:
+        return int(self.rows.sum())
+
+    def _other_axes(self, dim: Optional[str]) -> tuple:
+        return tuple(i for i, d in enumerate(self.dimensions) if d != dim)
+
+    def _labelled(self, dim: str, values: np.ndarray) -> np.ndarray:
+        # Drops the missing-value slot, if present, from a marginal along ``dim``
+        return values[:len(self.labels[dim])]
+
+    def mean(self, metric: str) -> Optional[float]:
+        m = self.metrics.index(metric)
+        count = self.counts[..., m].sum()
+        if count == 0:
+            return None
+        return (self.sums[..., m].sum() + self.residuals[..., m].sum()) / count
+
+    def mean_by(self, dim: str, metric: str) -> Dict[str, float]:
+        """Per-value means along ``dim``, omitting values with no rows (observed groups only)."""
+        m = self.metrics.index(metric)
+        axes = self._other_axes(dim)
+        sums = self._labelled(dim, self.sums[..., m].sum(axis=axes) + self.residuals[..., m].sum(axis=axes))
+        counts = self._labelled(dim, self.counts[..., m].sum(axis=axes))
+        observed = counts > 0
+        labels = np.asarray(self.labels[dim], dtype=object)[observed]
+        return dict(zip(labels, sums[observed] / counts[observed]))
+
+    def distribution_by(self, dim: str, metric: str, decimals: int) -> Dict[str, Dict[str, Any]]:
+        """Per-value count, min, percentiles, max and histogram along ``dim`` (observed groups only)."""
+        m = self.metrics.index(metric)
+        axes = self._other_axes(dim)
+        histograms = self.histograms[..., self.sketches.slices[metric]]
+        unfiltered = tuple(i for i in axes if self.dimensions[i] not in self.positions)
+        histograms = histograms.sum(axis=unfiltered, keepdims=True)
+        for axis, d in enumerate(self.dimensions):
+            if d in self.positions:
+                histograms = histograms.take(self.positions[d], axis=axis)
+        histograms = self._labelled(dim, histograms.sum(axis=axes))
+        mins = self.mins[..., m].min(axis=axes)
+        maxs = self.maxs[..., m].max(axis=axes)
+        return {
+            label: self.sketches.summary(metric, histograms[i], mins[i], maxs[i], decimals)
+            for i, label in enumerate(self.labels[dim])
+            if histograms[i].any()
+        }
+
+    def marginal(self, dims: List[str]) -> "GroupedAggregate":
+        """The same cells summed over every dimension not in ``dims``.
+
+        Reading distributions for several breakdowns off this costs one pass
+        over the histograms, instead of one per breakdown; pending positions
+        are applied on the way, after the unfiltered dimensions are summed away.
+        """
+        kept = [i for i, d in enumerate(self.dimensions) if d in dims]
+        dropped = tuple(i for i in range(len(self.dimensions)) if i not in kept)
+        histograms = None
+        if self.histograms is not None:
+            unfiltered = tuple(i for i in dropped if self.dimensions[i] not in self.positions)
+            # Counts never exceed the row count, so they are summed in the stored int32
+            dtype = self.histograms.dtype
+            histograms = self.histograms.sum(axis=unfiltered, keepdims=True, dtype=dtype)
+            for axis, d in enumerate(self.dimensions):
+                if d in self.positions:
+                    histograms = histograms.take(self.positions[d], axis=axis)
+            histograms = histograms.sum(axis=dropped, dtype=dtype)
+        sketched = histograms is not None
+        return GroupedAggregate(
+            sums=self.sums.sum(axis=dropped),
+            residuals=self.residuals.sum(axis=dropped),
+            counts=self.counts.sum(axis=dropped),
+            rows=self.rows.sum(axis=dropped),
+            dimensions=[self.dimensions[i] for i in kept],
+            labels={self.dimensions[i]: self.labels[self.dimensions[i]] for i in kept},
+            metrics=self.metrics,
+            sketches=self.sketches,
+            histograms=histograms,
+            mins=self.mins.min(axis=dropped) if sketched else None,
+            maxs=self.maxs.max(axis=dropped) if sketched else None,
+        )
+
+    def merge(self, other: "GroupedAggregate") -> "GroupedAggregate":
+        """Cells of both aggregates added together; labels, metrics and sketch bins must match.
+
+        Neither may be the result of ``take``.
+        """
+        sketched = self.histograms is not None
+        return GroupedAggregate(
+            sums=self.sums + other.sums,
+            residuals=self.residuals + other.residuals,
+            counts=self.counts + other.counts,
+            rows=self.rows + other.rows,
+            dimensions=self.dimensions,
+            labels=self.labels,
+            metrics=self.metrics,
+            sketches=self.sketches,
+            histograms=self.histograms + other.histograms if sketched else None,
+            mins=np.minimum(self.mins, other.mins) if sketched else None,
+            maxs=np.maximum(self.maxs, other.maxs) if sketched else None,
+        )
+
+    def take(self, positions: Dict[str, np.ndarray]) -> "GroupedAggregate":
+        """Sub-aggregate keeping only the given label positions per dimension.
+
+        A dimension without positions keeps everything, including rows missing
+        a value there, and costs nothing; one with positions keeps only those labels.
+        """
+        if not positions:
+            return self
+
+        def select(values: np.ndarray) -> np.ndarray:
+            for axis, dim in enumerate(self.dimensions):
+                if dim in positions:
+                    values = values.take(positions[dim], axis=axis)
+            return values
+
+        labels = {
+            dim: [self.labels[dim][i] for i in positions[dim]] if dim in positions else self.labels[dim]
+            for dim in self.dimensions
+        }
+        # Positions into the full histograms, composed with any earlier take
+        combined = dict(self.positions)
+        for dim, keep in positions.items():
+            combined[dim] = self.positions[dim][keep] if dim in self.positions else keep
+        sketched = self.histograms is not None
+        return GroupedAggregate(
+            sums=select(self.sums),
+            residuals=select(self.residuals),
+            counts=select(self.counts),
+            rows=select(self.rows),
+            dimensions=self.dimensions,
+            labels=labels,
+            metrics=self.metrics,
+            sketches=self.sketches,
+            histograms=self.histograms,
+            mins=select(self.mins) if sketched else None,
+            maxs=select(self.maxs) if sketched else None,
+            positions=combined if sketched else None,
+        )
+
+def aggregate(
+    codes: Dict[str, np.ndarray],
+    labels: Dict[str, List[str]],
+    values: Dict[str, np.ndarray],
+    sketches: Optional[SketchLayout] = None,
+) -> GroupedAggregate:
+    """Single pass: one joint cell id per row, then one bincount per metric.
+
+    ``codes`` maps each group-by column to its integer category codes (aligned
+    with the metric arrays in ``values``); ``labels`` gives the category names.
+    A code of -1 (missing value) goes to an extra slot after the last label.
+    With ``sketches``, also one bincount per metric over (cell, bin) pairs.
+    """
+    dimensions = list(codes)
+    metrics = list(values)
+    shape = tuple(len(labels[dim]) + 1 for dim in dimensions)
+    n_cells = int(np.prod(shape))
+
+    columns = []
+    for dim in dimensions:
+        column = codes[dim].astype(np.intp, copy=False)
+        if (column < 0).any():
+            column = np.where(column < 0, len(labels[dim]), column)
+        columns.append(column)
+    if len(columns[0]):
+        cell = np.ravel_multi_index(columns, shape)
+    else:
+        cell = np.zeros(0, dtype=np.intp)
+
+    rows = np.bincount(cell, minlength=n_cells).reshape(shape)
+    sums = np.empty(shape + (len(metrics),))
+    residuals = np.empty(shape + (len(metrics),))
+    counts = np.empty(shape + (len(metrics),), dtype=np.int64)
+    if sketches is not None:
+        histograms = np.empty(shape + (sketches.n_bins,), dtype=np.int32)
+        mins = np.full(n_cells * len(metrics), np.inf).reshape(len(metrics), n_cells)
+        maxs = np.full(n_cells * len(metrics), -np.inf).reshape(len(metrics), n_cells)
+    for m, metric in enumerate(metrics):
+        metric_values = np.asarray(values[metric], dtype=np.float64)
+        valid = ~np.isnan(metric_values)
+        if valid.all():
+            metric_cell, metric_count = cell, rows.reshape(-1)
+        else:
+            metric_cell = cell[valid]
+            metric_count = np.bincount(metric_cell, minlength=n_cells)
+        hi, lo = split_values(metric_values[valid])
+        sums[..., m] = np.bincount(metric_cell, weights=hi, minlength=n_cells).reshape(shape)
+        residuals[..., m] = np.bincount(metric_cell, weights=lo, minlength=n_cells).reshape(shape)
+        counts[..., m] = metric_count.reshape(shape)
+        if sketches is not None:
+            bins = sketches.slices[metric]
+            n_bins = bins.stop - bins.start
+            bin_cell = metric_cell * n_bins + sketches.bin_index(metric, metric_values[valid])
+            histograms[..., bins] = np.bincount(bin_cell, minlength=n_cells * n_bins).reshape(shape + (n_bins,))
+            np.minimum.at(mins[m], metric_cell, metric_values[valid])
+            np.maximum.at(maxs[m], metric_cell, metric_values[valid])
+
+    if sketches is None:
+        return GroupedAggregate(sums, residuals, counts, rows, dimensions, labels, metrics)
+    return GroupedAggregate(
+        sums, residuals, counts, rows, dimensions, labels, metrics,
+        sketches=sketches,
+        histograms=histograms,
+        mins=np.moveaxis(mins.reshape((len(metrics),) + shape), 0, -1),
+        maxs=np.moveaxis(maxs.reshape((len(metrics),) + shape), 0, -1),
+    )
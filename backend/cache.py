@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+# Bounds for the /filter-campaigns result cache
+QUERY_CACHE_SIZE = int(os.getenv("CAMPAIGNMIND_QUERY_CACHE_SIZE", "256"))
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("CAMPAIGNMIND_QUERY_CACHE_TTL", "300"))
+
+
+def canonical_filters(filters: Dict[str, Any]) -> tuple:
+    """Order-independent key: lists sorted and de-duplicated, None and empty both dropped."""
+    key = []
+    for name in sorted(filters):
+        value = filters[name]
+        if not value:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted(set(value)))
+        key.append((name, value))
+    return tuple(key)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    created: float
+
+
+def encode_response(result: Dict[str, Any]) -> CachedResponse:
+    # Same encoding as FastAPI's JSONResponse, so cached and fresh bodies are identical
+    body = json.dumps(result, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+    return CachedResponse(body=body, etag=etag, created=time.monotonic())
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class QueryCache:
+    """Bounded LRU + TTL cache of encoded responses, scoped to one dataset version.
+
+    Seeing a new dataset version drops every entry, so results computed from a
+    previous snapshot are never served after a reload.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_SIZE, ttl_seconds: float = QUERY_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _check_version(self, version: Optional[str]) -> None:
+        if version != self._version:
+            self.evictions += len(self._entries)
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: Hashable, version: Optional[str]) -> Optional[CachedResponse]:
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.created > self.ttl_seconds:
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, version: Optional[str], entry: CachedResponse) -> None:
+        with self._lock:
+            if version != self._version:
+                # Computed against a snapshot that is no longer current
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "dataset_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
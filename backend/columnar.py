@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import shutil
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+# A columnar store is a directory: one .npy file per column plus meta.json
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+
+
+def is_columnar(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def read_meta(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
+
+
+def _code_dtype(n_categories: int):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def reserve(buffer: np.ndarray, length: int) -> np.ndarray:
+    """``buffer`` if it holds ``length`` items, else a copy with room to grow by half again.
+
+    Appends write past the end a reader is using and never move data under it,
+    so buffers can be shared with snapshots that are still being read.
+    """
+    if len(buffer) >= length:
+        return buffer
+    grown = np.zeros(max(length, len(buffer) * 3 // 2), dtype=buffer.dtype)
+    grown[:len(buffer)] = buffer
+    return grown
+
+
+def write_columnar(df: pd.DataFrame, path: str, version: str) -> None:
+    """Write ``df`` as dictionary-encoded text columns and fixed-width numeric arrays.
+
+    The store is written to a sibling temp directory and renamed into place;
+    processes that already mapped the previous files keep reading them.
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    columns = {}
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        filename = f"{i:03d}.npy"
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = series.to_numpy(dtype="datetime64[ns]").view(np.int64)
+            columns[col] = {"kind": "datetime", "file": filename}
+        elif pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.to_numpy()
+            columns[col] = {"kind": "numeric", "file": filename}
+        else:
+            categorical = series.astype("category")
+            categories = [str(v) for v in categorical.cat.categories]
+            values = categorical.cat.codes.to_numpy().astype(_code_dtype(len(categories)))
+            columns[col] = {"kind": "category", "file": filename, "categories": categories}
+        np.save(os.path.join(tmp_path, filename), np.ascontiguousarray(values))
+
+    meta = {
+        "format": FORMAT_VERSION,
+        "version": version,
+        "n_rows": len(df),
+        "columns": columns,
+    }
+    with open(os.path.join(tmp_path, META_FILE), "w") as f:
+        json.dump(meta, f)
+
+    old_path = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def load_columnar(path: str) -> pd.DataFrame:
+    """Zero-copy load: every column is a read-only memory map of its .npy file.
+
+    Workers loading the same store share the file's page cache instead of each
+    holding a private parsed copy.
+    """
+    meta = read_meta(path)
+    data = {}
+    for col, spec in meta["columns"].items():
+        values = np.load(os.path.join(path, spec["file"]), mmap_mode="r")
+        if spec["kind"] == "category":
+            dtype = pd.CategoricalDtype(spec["categories"])
+            data[col] = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+        elif spec["kind"] == "datetime":
+            data[col] = values.view("datetime64[ns]")
+        else:
+            data[col] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def main():
+    from backend.dataset import DATA_PATH, file_digest, load_data
+
+    parser = argparse.ArgumentParser(description="Convert the cleaned campaign CSV to the columnar format")
+    parser.add_argument("csv", nargs="?", default=DATA_PATH)
+    parser.add_argument("--output", help="Target directory (default: <csv without extension>.columns)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.csv)[0] + ".columns"
+    df = load_data(args.csv)
+    write_columnar(df, output, version=file_digest(args.csv))
+    print(f"✅ Wrote {len(df)} rows to {output}")
+
+
+if __name__ == "__main__":
+    main()
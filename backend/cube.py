@@ -0,0 +1,68 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.aggregation import GroupedAggregate, aggregate
+from backend.sketch import SketchLayout
+
+
+def frame_codes(df: pd.DataFrame, dimensions: List[str]) -> Dict[str, np.ndarray]:
+    return {dim: df[dim].cat.codes.to_numpy() for dim in dimensions}
+
+
+def frame_labels(df: pd.DataFrame, dimensions: List[str]) -> Dict[str, List[str]]:
+    return {dim: [str(v) for v in df[dim].cat.categories] for dim in dimensions}
+
+
+class CampaignCube:
+    """Dense (sum, count) cube over the cross-product of the filter dimensions.
+
+    Every explorer response is a mean or a distribution, so any selection can
+    be answered from the cells it covers (sums, counts and histogram sketches);
+    query cost scales with the number of cells, not rows. Sketch bins are
+    placed from ``df`` unless a ``sketches`` layout is passed in.
+    """
+
+    def __init__(self, df: pd.DataFrame, dimensions: List[str], metrics: List[str],
+                 sketches: Optional[SketchLayout] = None):
+        self.dimensions = dimensions
+        self.metrics = metrics
+        self.sketches = sketches or SketchLayout(df, metrics)
+        self.cells = aggregate(
+            frame_codes(df, dimensions),
+            frame_labels(df, dimensions),
+            {metric: df[metric].to_numpy() for metric in metrics},
+            self.sketches,
+        )
+        self.labels = self.cells.labels
+        self.shape = self.cells.rows.shape
+
+    def extend(self, df: pd.DataFrame) -> "CampaignCube":
+        """Cube over these rows plus ``df`` (same categories): O(len(df) + cells)."""
+        extended = CampaignCube.__new__(CampaignCube)
+        extended.dimensions = self.dimensions
+        extended.metrics = self.metrics
+        # Bins stay as placed at build time; new outliers count in the end bins
+        extended.sketches = self.sketches
+        extended.cells = self.cells.merge(aggregate(
+            frame_codes(df, self.dimensions),
+            self.labels,
+            {metric: df[metric].to_numpy() for metric in self.metrics},
+            self.sketches,
+        ))
+        extended.labels = self.labels
+        extended.shape = self.shape
+        return extended
+
+    def _positions(self, dim: str, values: List[str]) -> np.ndarray:
+        lookup = {label: i for i, label in enumerate(self.labels[dim])}
+        return np.array(sorted({lookup[v] for v in values if v in lookup}), dtype=np.intp)
+
+    def rollup(self, selection: Dict[str, List[str]]) -> GroupedAggregate:
+        positions = {
+            dim: self._positions(dim, values)
+            for dim, values in selection.items()
+            if values and dim in self.labels
+        }
+        return self.cells.take(positions)
@@ -0,0 +1,359 @@
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, replace
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.columnar import META_FILE, is_columnar, load_columnar, read_meta, write_columnar
+from backend.cube import CampaignCube
+from backend.sketch import SketchLayout
+from backend.index import BitmapIndex
+from backend.ingest import COMPACT_ROWS, AppendableFrame, IngestLog, default_log_dir, prepare_rows
+from backend.retrieval import TEXT_COLUMN, SimilarityIndex
+from telemetry.metrics import stage
+
+# Path to your cleaned data file (override with CAMPAIGNMIND_DATA_PATH); may also
+# point at a columnar store directory written by `python -m backend.columnar`
+DATA_PATH = os.getenv(
+    "CAMPAIGNMIND_DATA_PATH",
+    "/Users/vemana/Documents/CampaignMind-Interactive-Social-Ad-Intelligence-System/backend/data/cleaned_campaign_data.csv",
+)
+
+# How often the background watcher checks the data file for changes
+RELOAD_INTERVAL_SECONDS = float(os.getenv("CAMPAIGNMIND_RELOAD_INTERVAL", "10"))
+
+# Columns the explorer filters and groups on; stored as categoricals
+FILTER_COLUMNS = [
+    "Channel_Used",
+    "Campaign_Goal",
+    "Target_Audience",
+    "Customer_Segment",
+    "Year_Quarter",
+    "Location",
+]
+
+# Metrics the explorer reports means of
+METRIC_COLUMNS = ["ROI", "Conversion_Rate", "Engagement_Score", "CTR"]
+
+
+def load_data(path: str = DATA_PATH) -> pd.DataFrame:
+    if is_columnar(path):
+        # Memory-mapped and already dictionary-encoded; Year_Quarter was derived at conversion
+        return load_columnar(path)
+
+    df = pd.read_csv(path, parse_dates=["Date"])
+    if "Year_Quarter" not in df.columns:
+        df["Year_Quarter"] = df["Date"].dt.to_period("Q").astype(str)
+    for col in FILTER_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def write_data(df: pd.DataFrame, path: str, version: str) -> str:
+    """Replace the data file (CSV or columnar store) with ``df``; returns its new version."""
+    if is_columnar(path):
+        write_columnar(df, path, version)
+        return version
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return file_digest(path)
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def source_file(path: str) -> str:
+    # The file whose mtime/size signals a change: the CSV itself or the store's meta.json
+    return os.path.join(path, META_FILE) if is_columnar(path) else path
+
+
+def source_version(path: str) -> str:
+    # Columnar stores carry the digest of the CSV they were converted from
+    return read_meta(path)["version"] if is_columnar(path) else file_digest(path)
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    # Rows as loaded (memory-mapped for a columnar store), and rows appended since;
+    # ``take`` reads across both
+    df: pd.DataFrame
+    version: str
+    mtime: float
+    size: int
+    index: BitmapIndex
+    cube: CampaignCube
+    retrieval: SimilarityIndex
+    # Version of the data file itself, and how far into its ingest log this snapshot reaches
+    base_version: str = ""
+    log_offset: int = 0
+    log_rows: int = 0
+    appended: Optional[pd.DataFrame] = None
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.df) + (0 if self.appended is None else len(self.appended))
+
+    def take(self, rows: Optional[np.ndarray] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """The rows at positions ``rows`` (all rows if None), in that order, with ``columns``.
+
+        Without appended rows this is a view of ``df``; otherwise the loaded and
+        appended parts are gathered separately and joined.
+        """
+        columns = list(self.df.columns) if columns is None else columns
+        if self.appended is None:
+            return self.df[columns] if rows is None else self.df[columns].iloc[rows]
+        if rows is None:
+            return pd.concat([self.df[columns], self.appended[columns]], ignore_index=True)
+        appended = rows >= len(self.df)
+        parts = pd.concat(
+            [self.df[columns].iloc[rows[~appended]], self.appended[columns].iloc[rows[appended] - len(self.df)]],
+            ignore_index=True,
+        )
+        # Back to the order asked for
+        order = np.concatenate([np.flatnonzero(~appended), np.flatnonzero(appended)])
+        return parts.iloc[np.argsort(order)].reset_index(drop=True)
+
+
+def build_snapshot(
+    df: pd.DataFrame, version: str, mtime: float, size: int, appended: Optional[pd.DataFrame] = None, **log
+) -> DatasetSnapshot:
+    # Derived structures are built here, once per load, and swapped in with the frame.
+    # Sketch bins and IDF weights come from the data file's rows only, with logged
+    # rows added on top: every process at a version then holds the same ones,
+    # whether it loaded that version or reached it by incremental appends
+    retrieval = SimilarityIndex(df[TEXT_COLUMN])
+    rows = df
+    if appended is not None:
+        retrieval = retrieval.extend(appended[TEXT_COLUMN])
+        # Only for building the index and cube; the snapshot keeps the two parts
+        columns = FILTER_COLUMNS + METRIC_COLUMNS
+        rows = pd.concat([df[columns], appended[columns]], ignore_index=True)
+    return DatasetSnapshot(
+        df=df,
+        version=version,
+        mtime=mtime,
+        size=size,
+        index=BitmapIndex(rows, FILTER_COLUMNS),
+        cube=CampaignCube(rows, FILTER_COLUMNS, METRIC_COLUMNS, SketchLayout(df, METRIC_COLUMNS)),
+        retrieval=retrieval,
+        base_version=log.get("base_version", version),
+        log_offset=log.get("log_offset", 0),
+        log_rows=log.get("log_rows", 0),
+        appended=appended,
+    )
+
+
+def extend_snapshot(snapshot: DatasetSnapshot, frame: AppendableFrame, rows: pd.DataFrame, log_offset: int) -> DatasetSnapshot:
+    """``snapshot`` with ``rows`` appended, updating the indexes and cube in O(len(rows)).
+
+    Rows with a new filter value change the cube's axes, so the index and cube
+    are rebuilt instead; the loaded frame is relabelled, never copied.
+    """
+    start = frame.n_rows
+    widened = frame.append(rows)
+    appended = frame.frame()
+    version = log_version(snapshot.base_version, log_offset)
+    if widened:
+        # A new channel, location, quarter...
+        with stage("dataset_build"):
+            return build_snapshot(
+                frame.categorize(snapshot.df),
+                version,
+                snapshot.mtime,
+                snapshot.size,
+                appended,
+                base_version=snapshot.base_version,
+                log_offset=log_offset,
+                log_rows=snapshot.log_rows + len(rows),
+            )
+    added = appended.iloc[start:]
+    return replace(
+        snapshot,
+        appended=appended,
+        version=version,
+        index=snapshot.index.extend(added),
+        cube=snapshot.cube.extend(added),
+        retrieval=snapshot.retrieval.extend(added[TEXT_COLUMN]),
+        log_offset=log_offset,
+        log_rows=snapshot.log_rows + len(rows),
+    )
+
+
+def log_version(base_version: str, log_offset: int) -> str:
+    # Same data file and log position means the same rows, in every process
+    return f"{base_version}+{log_offset}" if log_offset else base_version
+
+
+class DatasetStore:
+    """Process-wide, load-once holder for the campaign dataset.
+
+    Readers call ``get()`` and keep the returned snapshot for the duration of
+    a request; reloads build a complete new snapshot and swap the reference,
+    so a request never sees a half-loaded frame.
+
+    Ingested rows are logged next to the data file and appended to the resident
+    frame, indexes and cube in place of a reload; the watcher also picks up rows
+    other processes logged, and compacts the log into the data file once it
+    holds ``compact_rows`` rows.
+    """
+
+    def __init__(
+        self,
+        path: str = DATA_PATH,
+        reload_interval: float = RELOAD_INTERVAL_SECONDS,
+        log_dir: Optional[str] = None,
+        compact_rows: int = COMPACT_ROWS,
+    ):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.log = IngestLog(log_dir or default_log_dir(path))
+        self.compact_rows = compact_rows
+        self._snapshot: Optional[DatasetSnapshot] = None
+        # Column buffers behind the latest snapshot, from its first appended row
+        self._frame: Optional[AppendableFrame] = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def version(self) -> Optional[str]:
+        snapshot = self._snapshot
+        return snapshot.version if snapshot else None
+
+    def get(self) -> DatasetSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.reload()
+            snapshot = self._snapshot
+        return snapshot
+
+    def reload(self, force: bool = False) -> bool:
+        """Load the file if it changed since the last load. Returns True on swap."""
+        with self._load_lock:
+            stat = os.stat(source_file(self.path))
+            current = self._snapshot
+            if (
+                not force
+                and current is not None
+                and current.mtime == stat.st_mtime
+                and current.size == stat.st_size
+            ):
+                return False
+
+            version = source_version(self.path)
+            if not force and current is not None and current.base_version == version:
+                # Touched but unchanged: remember the new mtime, keep the frame
+                self._snapshot = replace(current, mtime=stat.st_mtime, size=stat.st_size)
+                return False
+
+            with stage("dataset_load"):
+                df = load_data(self.path)
+                # Rows ingested since the data file was last compacted
+                rows, log_offset = self.log.read(version)
+            with stage("dataset_build"):
+                snapshot = build_snapshot(df, version, stat.st_mtime, stat.st_size)
+            frame = None
+            if rows is not None:
+                # Replayed into append buffers as if ingested here, so the loaded
+                # (memory-mapped) frame is not copied
+                with stage("ingest_apply"):
+                    frame = AppendableFrame(df, FILTER_COLUMNS)
+                    snapshot = extend_snapshot(snapshot, frame, prepare_rows(rows, df), log_offset)
+            self._snapshot = snapshot
+            self._frame = frame
+            return True
+
+    def sync_log(self) -> bool:
+        """Append rows logged since the current snapshot. Returns True on swap."""
+        with self._load_lock:
+            current = self._snapshot
+            if current is None:
+                return False
+            rows, log_offset = self.log.read(current.base_version, current.log_offset)
+            if rows is None:
+                return False
+
+            with stage("ingest_apply"):
+                rows = prepare_rows(rows, current.df)
+                if self._frame is None:
+                    self._frame = AppendableFrame(current.df, FILTER_COLUMNS)
+                self._snapshot = extend_snapshot(current, self._frame, rows, log_offset)
+            return True
+
+    def ingest(self, rows: pd.DataFrame) -> DatasetSnapshot:
+        """Validate ``rows`` (raises IngestError), log them durably and append them."""
+        with stage("ingest_validate"):
+            rows = prepare_rows(rows, self.get().df)
+        with self.log.locked():
+            # Catch up with compactions and appends by other processes first
+            self.reload()
+            self.sync_log()
+            self.log.append(self._snapshot.base_version, rows)
+            self.sync_log()
+        return self._snapshot
+
+    def compact(self) -> bool:
+        """Write logged rows into the data file, which starts a new, empty log."""
+        self.get()
+        with self.log.locked():
+            self.reload()
+            self.sync_log()
+            with self._load_lock:
+                current = self._snapshot
+                if not current.log_rows:
+                    return False
+                with stage("ingest_compact"):
+                    version = hashlib.sha1(current.version.encode()).hexdigest()[:16]
+                    base_version = write_data(current.take(), self.path, version)
+                stat = os.stat(source_file(self.path))
+                # Loaded back as any other process would load the compacted file: the
+                # same sketch bins and IDF weights, and a columnar store mapped again
+                with stage("dataset_load"):
+                    df = load_data(self.path)
+                with stage("dataset_build"):
+                    self._snapshot = build_snapshot(df, base_version, stat.st_mtime, stat.st_size)
+                self._frame = None
+            self.log.remove(current.base_version)
+        return True
+
+    def start_watcher(self) -> None:
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="dataset-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.reload_interval + 1)
+            self._watcher = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            try:
+                self.reload()
+                self.sync_log()
+                snapshot = self._snapshot
+                if self.compact_rows and snapshot is not None and snapshot.log_rows >= self.compact_rows:
+                    self.compact()
+            except Exception as e:
+                # Keep serving the previous snapshot if the file is mid-write or invalid
+                print(f"⚠️ Dataset reload failed: {e}")
+
+
+# Shared store used by the API routes
+store = DatasetStore()
+
+
+def get_dataset() -> DatasetSnapshot:
+    return store.get()
@@ -1,14 +1,127 @@
-import pandas as pd
-from typing import Optional, List, Dict, Any
+import os
+import numpy as np
+from typing import Optional, List, Dict, Any, Sequence
+from backend.aggregation import GroupedAggregate, aggregate
+from backend.cube import frame_codes, frame_labels
+from backend.dataset import METRIC_COLUMNS, DatasetSnapshot, get_dataset
+from telemetry.metrics import ROWS_SCANNED, stage
 
-# Path to your cleaned data file
-DATA_PATH = "/Users/vemana/Documents/CampaignMind-Interactive-Social-Ad-Intelligence-System/backend/data/cleaned_campaign_data.csv"
+# "cube" answers from the pre-aggregated (sum, count) cube; "rows" filters raw rows
+FILTER_ENGINE = os.getenv("CAMPAIGNMIND_FILTER_ENGINE", "cube")
 
-def load_data() -> pd.DataFrame:
-    df = pd.read_csv(DATA_PATH, parse_dates=["Date"])
-    if "Year_Quarter" not in df.columns:
-        df["Year_Quarter"] = df["Date"].dt.to_period("Q").astype(str)
-    return df
+# Request argument -> dataset column
+FILTER_DIMENSIONS = {
+    "channel": "Channel_Used",
+    "goal": "Campaign_Goal",
+    "audience": "Target_Audience",
+    "segment": "Customer_Segment",
+    "quarter": "Year_Quarter",
+    "location": "Location",
+}
+
+# Group-by columns the response uses; gathered with the metrics after selection
+GROUP_COLUMNS = ["Channel_Used", "Target_Audience", "Year_Quarter", "Location"]
+
+# Headline KPIs: response key, metric, decimals
+SUMMARY_KPIS = [
+    ("average_roi", "ROI", 2),
+    ("average_conversion_rate", "Conversion_Rate", 4),
+    ("average_engagement_score", "Engagement_Score", 2),
+    ("average_ctr", "CTR", 4),
+]
+
+# Grouped breakdowns: response key, group-by column, metric, decimals
+BREAKDOWNS = [
+    # Platform-based
+    ("roi_by_channel", "Channel_Used", "ROI", 2),
+    ("conversion_by_channel", "Channel_Used", "Conversion_Rate", 4),
+    # Audience- and time-based
+    ("engagement_by_audience", "Target_Audience", "Engagement_Score", 2),
+    ("ctr_by_quarter", "Year_Quarter", "CTR", 4),
+    # Location-based
+    ("roi_by_location", "Location", "ROI", 2),
+    ("conversion_by_location", "Location", "Conversion_Rate", 4),
+    ("engagement_by_location", "Location", "Engagement_Score", 2),
+    ("ctr_by_location", "Location", "CTR", 4),
+]
+BREAKDOWN_KEYS = [key for key, _, _, _ in BREAKDOWNS]
+
+
+def build_selection(**filters) -> Dict[str, List[str]]:
+    # Single-valued filters (goal, segment) become one-element lists
+    selection = {}
+    for arg, value in filters.items():
+        if not value:
+            continue
+        selection[FILTER_DIMENSIONS[arg]] = [value] if isinstance(value, str) else list(value)
+    return selection
+
+def empty_response(distributions: Sequence[str] = ()) -> Dict[str, Any]:
+    response = {"message": "No campaigns match the selected filters."}
+    response.update({key: None for key, _, _ in SUMMARY_KPIS})
+    response.update({key: {} for key, _, _, _ in BREAKDOWNS})
+    if distributions:
+        response["distributions"] = {key: {} for key in distributions}
+    return response
+
+def _round_dict(means: Dict[str, float], decimals: int) -> Dict[str, float]:
+    return {label: float(np.round(value, decimals)) for label, value in means.items()}
+
+def build_response(cells: GroupedAggregate, distributions: Sequence[str] = ()) -> Dict[str, Any]:
+    # If no matching data
+    if cells.row_count == 0:
+        return empty_response(distributions)
+
+    # Compute summary stats and grouped breakdowns as marginals of the same cells
+    response = {"message": "Success"}
+    for key, metric, decimals in SUMMARY_KPIS:
+        response[key] = float(np.round(cells.mean(metric), decimals))
+    for key, group, metric, decimals in BREAKDOWNS:
+        response[key] = _round_dict(cells.mean_by(group, metric), decimals)
+
+    # Per-group percentiles and histograms for the breakdowns asked for, from the
+    # merged sketches: size and cost depend on groups and bins, not on matching rows
+    if not distributions:
+        return response
+    requested = [breakdown for breakdown in BREAKDOWNS if breakdown[0] in distributions]
+    marginal = cells.marginal([group for _, group, _, _ in requested])
+    response["distributions"] = {}
+    for key, group, metric, decimals in requested:
+        response["distributions"][key] = {
+            "edges": [round(float(e), decimals + 2) for e in cells.sketches.edges[metric]],
+            "groups": marginal.distribution_by(group, metric, decimals),
+        }
+    return response
+
+def rows_response(snapshot: DatasetSnapshot, selection: Dict[str, List[str]],
+                  distributions: Sequence[str] = ()) -> Dict[str, Any]:
+    # Select via the bitmap index, then gather codes and metrics for one aggregation pass
+    with stage("filter_select"):
+        rows = snapshot.index.select(selection)
+    with stage("filter_gather"):
+        # A view of the resident columns, unless rows were appended since the load
+        df = snapshot.take(columns=GROUP_COLUMNS + METRIC_COLUMNS)
+        codes = frame_codes(df, GROUP_COLUMNS)
+        values = {metric: df[metric].to_numpy() for metric in METRIC_COLUMNS}
+        if rows is not None:
+            codes = {col: c[rows] for col, c in codes.items()}
+            values = {metric: v[rows] for metric, v in values.items()}
+    ROWS_SCANNED.observe(len(df) if rows is None else len(rows), engine="rows")
+    with stage("filter_aggregate"):
+        # Histograms only when a distribution was asked for
+        sketches = snapshot.cube.sketches if distributions else None
+        cells = aggregate(codes, frame_labels(df, GROUP_COLUMNS), values, sketches)
+    with stage("filter_respond"):
+        return build_response(cells, distributions)
+
+def cube_response(snapshot: DatasetSnapshot, selection: Dict[str, List[str]],
+                  distributions: Sequence[str] = ()) -> Dict[str, Any]:
+    # Roll up the cells covered by the selection; never touches raw rows
+    with stage("filter_rollup"):
+        cells = snapshot.cube.rollup(selection)
+    ROWS_SCANNED.observe(cells.rows.size, engine="cube")
+    with stage("filter_respond"):
+        return build_response(cells, distributions)
 
 def filter_campaigns(
     channel: Optional[List[str]] = None,
@@ -16,61 +129,21 @@ def filter_campaigns(
     audience: Optional[List[str]] = None,
     segment: Optional[str] = None,
     quarter: Optional[List[str]] = None,
-    location: Optional[List[str]] = None
+    location: Optional[List[str]] = None,
+    snapshot: Optional[DatasetSnapshot] = None,
+    distributions: Sequence[str] = (),
 ) -> Dict[str, Any]:
-    df = load_data()
-
-    # Apply filters
-    if channel:
-        df = df[df["Channel_Used"].isin(channel)]
-    if goal:
-        df = df[df["Campaign_Goal"] == goal]
-    if audience:
-        df = df[df["Target_Audience"].isin(audience)]
-    if segment:
-        df = df[df["Customer_Segment"] == segment]
-    if quarter:
-        df = df[df["Year_Quarter"].isin(quarter)]
-    if location:
-        df = df[df["Location"].isin(location)]
-
-    # If no matching data
-    if df.empty:
-        return {
-            "message": "No campaigns match the selected filters.",
-            "average_roi": None,
-            "average_conversion_rate": None,
-            "average_engagement_score": None,
-            "average_ctr": None,
-            "roi_by_channel": {},
-            "conversion_by_channel": {},
-            "engagement_by_audience": {},
-            "ctr_by_quarter": {},
-            "roi_by_location": {},
-            "conversion_by_location": {},
-            "engagement_by_location": {},
-            "ctr_by_location": {}
-        }
+    # Callers that key caches on the data version pass the snapshot they read it from
+    snapshot = snapshot or get_dataset()
+    selection = build_selection(
+        channel=channel,
+        goal=goal,
+        audience=audience,
+        segment=segment,
+        quarter=quarter,
+        location=location,
+    )
 
-    # Compute summary stats and grouped breakdowns
-    return {
-        "message": "Success",
-        "average_roi": round(df["ROI"].mean(), 2),
-        "average_conversion_rate": round(df["Conversion_Rate"].mean(), 4),
-        "average_engagement_score": round(df["Engagement_Score"].mean(), 2),
-        "average_ctr": round(df["CTR"].mean(), 4),
-
-        # Platform-based
-        "roi_by_channel": df.groupby("Channel_Used")["ROI"].mean().round(2).to_dict(),
-        "conversion_by_channel": df.groupby("Channel_Used")["Conversion_Rate"].mean().round(4).to_dict(),
-
-        # Audience- and time-based
-        "engagement_by_audience": df.groupby("Target_Audience")["Engagement_Score"].mean().round(2).to_dict(),
-        "ctr_by_quarter": df.groupby("Year_Quarter")["CTR"].mean().round(4).to_dict(),
-
-        # Location-based
-        "roi_by_location": df.groupby("Location")["ROI"].mean().round(2).to_dict(),
-        "conversion_by_location": df.groupby("Location")["Conversion_Rate"].mean().round(4).to_dict(),
-        "engagement_by_location": df.groupby("Location")["Engagement_Score"].mean().round(2).to_dict(),
-        "ctr_by_location": df.groupby("Location")["CTR"].mean().round(4).to_dict()
-    }
+    if FILTER_ENGINE == "cube":
+        return cube_response(snapshot, selection, distributions)
+    return rows_response(snapshot, selection, distributions)
@@ -0,0 +1,77 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.columnar import reserve
+
+
+class BitmapIndex:
+    """One packed bitmask per (dimension, value), built once per snapshot.
+
+    A selection ORs the masks of the requested values within a dimension and
+    ANDs the results across dimensions, working 8 rows per byte instead of
+    comparing every cell of every filtered column.
+    """
+
+    def __init__(self, df: pd.DataFrame, dimensions: List[str]):
+        self.n_rows = len(df)
+        self.bitmaps: Dict[str, Dict[str, np.ndarray]] = {}
+        for dim in dimensions:
+            codes = df[dim].cat.codes.to_numpy()
+            categories = df[dim].cat.categories
+            self.bitmaps[dim] = {
+                str(value): np.packbits(codes == i) for i, value in enumerate(categories)
+            }
+        self._empty = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+
+    def extend(self, df: pd.DataFrame) -> "BitmapIndex":
+        """Index over these rows followed by ``df`` (same categories), in O(len(df)).
+
+        New bits go into spare capacity past this index's last byte, which it
+        never reads, so readers still holding this index are unaffected.
+        """
+        n_rows = self.n_rows + len(df)
+        start, used = divmod(self.n_rows, 8)
+        extended = BitmapIndex.__new__(BitmapIndex)
+        extended.n_rows = n_rows
+        extended.bitmaps = {}
+        for dim, dim_bitmaps in self.bitmaps.items():
+            codes = df[dim].cat.codes.to_numpy()
+            extended.bitmaps[dim] = {}
+            for i, (value, bitmap) in enumerate(dim_bitmaps.items()):
+                bits = codes == i
+                if used:
+                    # Repack the partly used last byte together with the new rows
+                    bits = np.concatenate([np.unpackbits(bitmap[start:start + 1], count=used).astype(bool), bits])
+                packed = np.packbits(bits)
+                buffer = reserve(bitmap.base if bitmap.base is not None else bitmap, start + len(packed))
+                buffer[start:start + len(packed)] = packed
+                extended.bitmaps[dim][value] = buffer[:(n_rows + 7) // 8]
+        extended._empty = np.zeros((n_rows + 7) // 8, dtype=np.uint8)
+        return extended
+
+    def mask(self, selection: Dict[str, List[str]]) -> Optional[np.ndarray]:
+        """Packed mask for ``{dimension: [values]}``; None means every row matches."""
+        result = None
+        for dim, values in selection.items():
+            if not values:
+                continue
+            dim_bitmaps = self.bitmaps[dim]
+            dim_mask = self._empty.copy()
+            for value in values:
+                bitmap = dim_bitmaps.get(value)
+                if bitmap is not None:
+                    np.bitwise_or(dim_mask, bitmap, out=dim_mask)
+            if result is None:
+                result = dim_mask
+            else:
+                np.bitwise_and(result, dim_mask, out=result)
+        return result
+
+    def select(self, selection: Dict[str, List[str]]) -> Optional[np.ndarray]:
+        """Matching row positions, or None when the selection is unfiltered."""
+        packed = self.mask(selection)
+        if packed is None:
+            return None
+        return np.flatnonzero(np.unpackbits(packed, count=self.n_rows))
@@ -0,0 +1,273 @@
+import argparse
+import fcntl
+import io
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.columnar import reserve
+
+# Where ingested rows are logged until compaction (default: next to the data file)
+INGEST_LOG_DIR = os.getenv("CAMPAIGNMIND_INGEST_LOG_DIR")
+
+# Logged rows that trigger a compaction into the data file (0: only on demand)
+COMPACT_ROWS = int(os.getenv("CAMPAIGNMIND_INGEST_COMPACT_ROWS", "100000"))
+
+# Upper bound on rows accepted by one ingest request
+MAX_INGEST_ROWS = int(os.getenv("CAMPAIGNMIND_MAX_INGEST_ROWS", "50000"))
+
+# Derived from Date on ingest rather than accepted from the caller
+DERIVED_COLUMNS = ["Year_Quarter"]
+
+# Validation errors reported back per request
+MAX_REPORTED_ERRORS = 50
+
+
+class IngestError(ValueError):
+    """Rows that do not match the dataset schema; ``errors`` lists each problem."""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(f"{len(errors)} invalid values in ingested rows")
+        self.errors = errors
+
+
+def default_log_dir(data_path: str) -> str:
+    return INGEST_LOG_DIR or os.path.splitext(data_path.rstrip("/"))[0] + ".ingest"
+
+
+def prepare_rows(rows: pd.DataFrame, template: pd.DataFrame) -> pd.DataFrame:
+    """Validate ``rows`` against the columns and types of ``template`` and convert them.
+
+    Every column of the dataset is required and must be non-empty; numbers and
+    dates must parse, integer columns must hold whole numbers. Text columns are
+    returned as plain strings; ``Year_Quarter`` is derived from ``Date``.
+    """
+    expected = [col for col in template.columns if col not in DERIVED_COLUMNS]
+    missing = [col for col in expected if col not in rows.columns]
+    unknown = [col for col in rows.columns if col not in template.columns]
+    if missing or unknown:
+        raise IngestError(
+            [{"row": None, "column": col, "error": "missing column"} for col in missing]
+            + [{"row": None, "column": col, "error": "unknown column"} for col in unknown]
+        )
+
+    rows = rows.reset_index(drop=True)
+    errors = []
+    converted = {}
+    for col in expected:
+        dtype = template[col].dtype
+        raw = rows[col]
+        empty = raw.isna() | (raw.astype(str) == "")
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            values = pd.to_datetime(raw.where(~empty), errors="coerce", format="ISO8601")
+            invalid, problem = values.isna() & ~empty, "not an ISO date"
+            values = values.astype(dtype)
+        elif pd.api.types.is_numeric_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype):
+            values = pd.to_numeric(raw.where(~empty), errors="coerce")
+            invalid, problem = values.isna() & ~empty, "not a number"
+            if pd.api.types.is_integer_dtype(dtype):
+                invalid, problem = invalid | (values % 1 > 0), "not a whole number"
+                values = values.fillna(0).astype(dtype)
+        else:
+            values = raw.astype(str).astype(object)
+            empty |= values.str.strip() == ""
+            invalid, problem = pd.Series(False, index=raw.index), None
+        for i in np.flatnonzero(empty):
+            errors.append({"row": int(i), "column": col, "error": "missing value"})
+        for i in np.flatnonzero(invalid):
+            errors.append({"row": int(i), "column": col, "error": f"{problem}: {raw[i]!r}"})
+        converted[col] = values
+
+    if errors:
+        errors.sort(key=lambda e: (e["row"], expected.index(e["column"])))
+        raise IngestError(errors[:MAX_REPORTED_ERRORS])
+
+    df = pd.DataFrame(converted)
+    if "Year_Quarter" in template.columns:
+        df["Year_Quarter"] = df["Date"].dt.to_period("Q").astype(str)
+    return df[list(template.columns)]
+
+
+class AppendableFrame:
+    """Rows appended to the resident dataset, as column buffers with spare capacity.
+
+    The loaded frame is only used as a template, never copied, so a memory-mapped
+    store stays shared between processes; the buffers hold just the appended rows.
+    ``frame()`` wraps the first ``n_rows`` of every buffer in a DataFrame without
+    copying; appends write past that point, so earlier frames stay valid for
+    readers still holding them. Appending costs time in the batch, not the history.
+
+    A filter value the dataset has not seen goes at the end of its column's
+    categories, so codes already written, in the buffers or in the loaded
+    frame, keep their meaning; ``categorize`` relabels the loaded frame to match.
+    """
+
+    def __init__(self, template: pd.DataFrame, categorical: List[str]):
+        self.n_rows = 0
+        self.dtypes = {}
+        self.buffers: Dict[str, np.ndarray] = {}
+        for col in template.columns:
+            series = template[col]
+            if col in categorical:
+                # Filter columns keep their codes
+                self.dtypes[col] = series.dtype
+                dtype = series.cat.codes.dtype
+            elif pd.api.types.is_datetime64_any_dtype(series) or (
+                pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype)
+            ):
+                dtype = series.to_numpy()[:0].dtype
+            else:
+                # Other text (descriptions) as plain objects, so new values cost nothing extra
+                dtype = object
+            self.buffers[col] = np.empty(0, dtype=dtype)
+
+    def frame(self) -> pd.DataFrame:
+        data = {}
+        for col, buffer in self.buffers.items():
+            values = buffer[:self.n_rows]
+            if col in self.dtypes:
+                data[col] = pd.Categorical.from_codes(values, dtype=self.dtypes[col], validate=False)
+            else:
+                data[col] = values
+        return pd.DataFrame(data, copy=False)
+
+    def categorize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """``df`` (the template) with its filter columns over this frame's categories.
+
+        The codes are reused, not copied, unless the new categories need wider ones.
+        """
+        columns = {
+            col: pd.Categorical.from_codes(df[col].array.codes, dtype=dtype, validate=False)
+            for col, dtype in self.dtypes.items()
+            if df[col].dtype != dtype
+        }
+        if not columns:
+            return df
+        # Not ``assign``, which copies the columns it sets
+        return pd.DataFrame({col: columns.get(col, df[col]) for col in df.columns}, copy=False)
+
+    def append(self, rows: pd.DataFrame) -> bool:
+        """Append rows from ``prepare_rows``; True if a filter column had a value the
+        dataset has not seen, which changes the categories (and the cube's axes)."""
+        codes = {}
+        widened = False
+        for col, dtype in self.dtypes.items():
+            # In order of first appearance, so a process replaying the whole log
+            # ends up with the same categories as one that appended it batch by batch
+            unseen = [value for value in pd.unique(rows[col]) if value not in dtype.categories]
+            if unseen:
+                dtype = self.dtypes[col] = pd.CategoricalDtype(list(dtype.categories) + unseen)
+                widened = True
+            codes[col] = pd.Categorical(rows[col], dtype=dtype).codes
+
+        start, end = self.n_rows, self.n_rows + len(rows)
+        for col, buffer in self.buffers.items():
+            values = codes[col] if col in codes else rows[col].to_numpy()
+            if col in codes and values.dtype.itemsize > buffer.dtype.itemsize:
+                buffer = buffer.astype(values.dtype)
+            buffer = reserve(buffer, end)
+            buffer[start:end] = values
+            self.buffers[col] = buffer
+        self.n_rows = end
+        return widened
+
+
+class IngestLog:
+    """Append-only CSV log of ingested rows, one file per version of the data file.
+
+    Compaction writes the logged rows into the data file, which gives it a new
+    version and so an empty log; the old log is then deleted. Keying logs on
+    the data file's version means a process never applies rows twice, whether
+    it sees the data file before or after a compaction. Appends and compaction
+    hold an exclusive file lock, so several server processes can share a log.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def path(self, base_version: str) -> str:
+        return os.path.join(self.directory, f"{base_version}.csv")
+
+    @contextmanager
+    def locked(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, open(os.path.join(self.directory, ".lock"), "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def append(self, base_version: str, rows: pd.DataFrame) -> None:
+        # Call under ``locked()``; fsync'd so an acknowledged batch survives a crash
+        path = self.path(base_version)
+        header = not os.path.exists(path)
+        with open(path, "a", newline="") as f:
+            rows.to_csv(f, header=header, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self, base_version: str, offset: int = 0) -> Tuple[Optional[pd.DataFrame], int]:
+        """Rows logged after byte ``offset`` (all as text), and the offset to resume from."""
+        try:
+            f = open(self.path(base_version), "rb")
+        except FileNotFoundError:
+            return None, offset
+        with f:
+            header = f.readline()
+            f.seek(max(offset, len(header)))
+            start = f.tell()
+            data = f.read()
+        # A line still being written is left for the next read
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return None, start
+        rows = pd.read_csv(io.BytesIO(header + data[:end]), dtype=str, keep_default_na=False)
+        return rows, start + end
+
+    def remove(self, base_version: str) -> None:
+        try:
+            os.remove(self.path(base_version))
+        except FileNotFoundError:
+            pass
+
+
+def read_rows(path: str) -> pd.DataFrame:
+    # CSV or JSON Lines, all values as text; prepare_rows does the typing
+    if path.endswith(".jsonl"):
+        return pd.read_json(path, lines=True, dtype=False).astype(str)
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def main():
+    from backend.dataset import DatasetStore, DATA_PATH
+
+    parser = argparse.ArgumentParser(description="Append campaign rows to the dataset, or compact its ingest log")
+    parser.add_argument("rows", nargs="?", help="CSV or JSONL file of new campaigns")
+    parser.add_argument("--data", default=DATA_PATH, help="Data file (CSV or columnar store)")
+    parser.add_argument("--compact", action="store_true", help="Write logged rows into the data file")
+    args = parser.parse_args()
+
+    store = DatasetStore(args.data)
+    if args.rows:
+        try:
+            snapshot = store.ingest(read_rows(args.rows))
+        except IngestError as e:
+            for error in e.errors:
+                print(f"❌ row {error['row']} {error['column']}: {error['error']}")
+            raise SystemExit(1)
+        print(f"✅ Logged rows from {args.rows}; dataset now has {snapshot.n_rows} rows")
+    if args.compact:
+        if store.compact():
+            print(f"✅ Compacted the ingest log into {args.data}")
+        else:
+            print("Nothing to compact")
+
+
+if __name__ == "__main__":
+    main()
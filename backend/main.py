@@ -1,11 +1,63 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import Optional, List
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional, List
 from fastapi.middleware.cors import CORSMiddleware
-from backend.filters import filter_campaigns
-from models.inference import generate_campaign_prediction
+from starlette.concurrency import run_in_threadpool
+from backend.cache import QueryCache, canonical_filters, encode_response, etag_matches
+from backend.dataset import store
+from backend.filters import BREAKDOWN_KEYS, filter_campaigns
+from backend.ingest import MAX_INGEST_ROWS, IngestError
+from backend.profiler import PROFILE_SLOW_MS, finish_profile, profile_path, start_profile
+from backend.similar import MAX_SIMILAR_K, SIMILAR_K, similar_campaigns
+from models.batching import PREDICTION_TIMEOUT_SECONDS, DeadlineExceeded, MicroBatcher, Overloaded
+from models import inference
+from models.inference import BASE_MODEL, INFERENCE_BACKEND, MAX_PREDICTION_TOKENS, MODEL_DIR, generate_campaign_predictions
+from models.parsing import parse_prediction
+from models.prediction_cache import PredictionCache, model_identity
+from telemetry.metrics import PREDICTIONS, REGISTRY, REQUEST_SECONDS, stage
 
-app = FastAPI()
+# Load the model in the background at startup (0: load on the first prediction instead)
+PRELOAD_MODEL = os.getenv("CAMPAIGNMIND_PRELOAD_MODEL", "1") == "1"
+
+# Upper bound on descriptions accepted by one bulk prediction request
+MAX_BULK_DESCRIPTIONS = int(os.getenv("CAMPAIGNMIND_MAX_BULK_DESCRIPTIONS", "5000"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the dataset once per worker and keep it fresh in the background; the
+    # model loads on its own thread so analytics routes serve immediately
+    store.get()
+    store.start_watcher()
+    if PRELOAD_MODEL:
+        inference.start_background_load()
+    batcher.start()
+    yield
+    batcher.stop()
+    store.stop_watcher()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Groups concurrent /predict-campaign-outcome calls into padded generate() batches, on
+# its own bounded set of inference threads rather than the request threadpool
+batcher = MicroBatcher(generate_campaign_predictions)
+
+# Generated predictions, in memory and on disk, keyed to the loaded adapter and backend
+prediction_cache = PredictionCache(model_identity(MODEL_DIR, BASE_MODEL, INFERENCE_BACKEND))
+
+# Encoded /filter-campaigns responses, keyed by canonical filters and dataset version
+query_cache = QueryCache()
 
 # CORS settings (adjust origin in production)
 app.add_middleware(
@@ -16,6 +68,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    # Latency per route through the last body byte, so streamed responses count in full.
+    # With CAMPAIGNMIND_PROFILE_DIR set, "X-Profile: 1" requests (and, with
+    # CAMPAIGNMIND_PROFILE_SLOW_MS, slow ones) leave a collapsed-stack profile there
+    requested = request.headers.get("x-profile") == "1"
+    profiler = start_profile() if requested or PROFILE_SLOW_MS else None
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        if profiler is not None:
+            await run_in_threadpool(finish_profile, profiler, None)
+        raise
+
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    labels = {"route": route, "method": request.method, "status": response.status_code}
+    path = profile_path(route) if profiler is not None else None
+    if requested and path is not None:
+        response.headers["X-Profile-Path"] = path
+    body = response.body_iterator
+
+    async def observed():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUEST_SECONDS.observe(elapsed, **labels)
+            if profiler is not None:
+                slow = PROFILE_SLOW_MS and elapsed * 1000 >= PROFILE_SLOW_MS
+                await run_in_threadpool(finish_profile, profiler, path if requested or slow else None)
+                if slow and not requested:
+                    print(f"🐢 {request.method} {route} took {elapsed * 1000:.0f} ms; profile: {path}")
+
+    response.body_iterator = observed()
+    return response
+
 # Request model for frontend filter submission
 class FilterRequest(BaseModel):
     channel: Optional[List[str]] = None
@@ -24,24 +115,367 @@ class FilterRequest(BaseModel):
     segment: Optional[str] = None
     quarter: Optional[List[str]] = None
     location: Optional[List[str]] = None  
+    # Breakdown keys (e.g. "engagement_by_location") to add per-group distributions for
+    distributions: List[str] = []
 
 class CampaignInput(BaseModel):
     description: str
 
+class BulkCampaignInput(BaseModel):
+    descriptions: List[str]
+    max_tokens: int = Field(128, ge=1, le=MAX_PREDICTION_TOKENS)
+
+class IngestInput(BaseModel):
+    rows: List[Dict[str, Any]]
+
+class SimilarCampaignsInput(BaseModel):
+    description: str
+    k: int = SIMILAR_K
+
 # API route to process filters and return campaign KPIs
 @app.post("/filter-campaigns")
-def get_filtered_campaigns(filters: FilterRequest):
-    return filter_campaigns(
-        channel=filters.channel,
-        goal=filters.goal,
-        audience=filters.audience,
-        segment=filters.segment,
-        quarter=filters.quarter,
-        location=filters.location  
+def get_filtered_campaigns(filters: FilterRequest, request: Request):
+    unknown = sorted(set(filters.distributions) - set(BREAKDOWN_KEYS))
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown distributions {unknown}; expected some of {BREAKDOWN_KEYS}.")
+    snapshot = store.get()
+    key = canonical_filters({
+        "channel": filters.channel,
+        "goal": filters.goal,
+        "audience": filters.audience,
+        "segment": filters.segment,
+        "quarter": filters.quarter,
+        "location": filters.location,
+        "distributions": filters.distributions,
+    })
+
+    with stage("cache_lookup"):
+        cached = query_cache.get(key, snapshot.version)
+    if cached is None:
+        response = filter_campaigns(
+            channel=filters.channel,
+            goal=filters.goal,
+            audience=filters.audience,
+            segment=filters.segment,
+            quarter=filters.quarter,
+            location=filters.location,
+            snapshot=snapshot,
+            distributions=filters.distributions,
+        )
+        with stage("serialize"):
+            cached = encode_response(response)
+        query_cache.put(key, snapshot.version, cached)
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+# Appends new campaigns to the explorer's data without reloading it
+@app.post("/ingest-campaigns")
+def ingest_campaigns(payload: IngestInput):
+    if not payload.rows:
+        raise HTTPException(status_code=422, detail="No rows to ingest.")
+    if len(payload.rows) > MAX_INGEST_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_INGEST_ROWS} rows per request.",
+        )
+    try:
+        snapshot = store.ingest(pd.DataFrame(payload.rows))
+    except IngestError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "errors": e.errors})
+    return {
+        "ingested": len(payload.rows),
+        "dataset_version": snapshot.version,
+        "total_rows": snapshot.n_rows,
+        "rows_pending_compaction": snapshot.log_rows,
+    }
+
+
+# Past campaigns with the most similar descriptions, and what they actually achieved
+@app.post("/similar-campaigns")
+def get_similar_campaigns(payload: SimilarCampaignsInput):
+    if not 1 <= payload.k <= MAX_SIMILAR_K:
+        raise HTTPException(status_code=422, detail=f"k must be between 1 and {MAX_SIMILAR_K}.")
+    snapshot = store.get()
+    return {"dataset_version": snapshot.version, **similar_campaigns(payload.description, payload.k, snapshot)}
+
+
+@app.get("/health")
+def health():
+    # 200 once the dataset is loaded, so analytics routes are not held back while
+    # the model loads; the model's state is reported but gated on /health/inference
+    ready = store.version is not None
+    body = {
+        "status": "ready" if ready else "starting",
+        "dataset_version": store.version,
+        "inference": inference.model_status(),
+        "executor": batcher.stats(),
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+@app.get("/health/inference")
+def health_inference():
+    # 200 once the prediction model can serve requests (503 with its loading state before that)
+    model = inference.model_status()
+    ready = model["state"] == "ready"
+    return JSONResponse({"status": "ready" if ready else "starting", "inference": model}, status_code=200 if ready else 503)
+
+
+@app.get("/cache-stats")
+def get_cache_stats():
+    return {
+        "filter_campaigns": query_cache.stats(),
+        "predictions": prediction_cache.stats(),
+    }
+
+
+def collect_service_metrics():
+    # Read at scrape time from the counters the caches and executor already keep
+    queries, predictions, executor = query_cache.stats(), prediction_cache.stats(), batcher.stats()
+    yield "campaignmind_cache_hits_total", "counter", "Cache lookups answered from the cache.", [
+        ({"cache": "filter"}, queries["hits"]),
+        ({"cache": "prediction_memory"}, predictions["memory_hits"]),
+        ({"cache": "prediction_disk"}, predictions["disk_hits"]),
+    ]
+    yield "campaignmind_cache_misses_total", "counter", "Cache lookups that had to compute.", [
+        ({"cache": "filter"}, queries["misses"]),
+        ({"cache": "prediction"}, predictions["misses"]),
+    ]
+    yield "campaignmind_cache_hit_ratio", "gauge", "Hits over lookups since start.", [
+        ({"cache": "filter"}, queries["hit_rate"]),
+        ({"cache": "prediction"}, predictions["hit_rate"]),
+    ]
+    yield "campaignmind_cache_entries", "gauge", "Entries held in memory.", [
+        ({"cache": "filter"}, queries["entries"]),
+        ({"cache": "prediction"}, predictions["memory_entries"]),
+    ]
+    yield "campaignmind_predictions_pending", "gauge", "Predictions admitted and not finished.", [
+        ({}, executor["pending"]),
+    ]
+    yield "campaignmind_predictions_queued", "gauge", "Predictions waiting for an inference thread.", [
+        ({}, executor["queued"]),
+    ]
+    yield "campaignmind_predictions_rejected_total", "counter", "Predictions refused with 503 (queue full).", [
+        ({}, executor["rejected"]),
+    ]
+    yield "campaignmind_predictions_expired_total", "counter", "Predictions dropped at their deadline.", [
+        ({}, executor["expired"]),
+    ]
+    yield "campaignmind_model_ready", "gauge", "1 once the prediction model is loaded.", [
+        ({}, int(inference.is_ready())),
+    ]
+    snapshot = store.get()
+    yield "campaignmind_dataset_rows", "gauge", "Rows in the resident dataset.", [
+        ({}, snapshot.n_rows),
+    ]
+    yield "campaignmind_ingest_log_rows", "gauge", "Ingested rows not yet compacted into the data file.", [
+        ({}, snapshot.log_rows),
+    ]
+
+
+REGISTRY.add_collector(collect_service_metrics)
+
+
+@app.get("/metrics")
+def metrics():
+    # Prometheus text exposition format
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def require_model_ready() -> None:
+    if not inference.is_ready():
+        inference.start_background_load()
+        raise HTTPException(
+            status_code=503,
+            detail=f"Prediction model is {inference.model_status()['state']}; retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+
+
+def overloaded(e: Overloaded) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"Prediction queue is full ({e}); retry shortly.",
+        headers={"Retry-After": "2"},
     )
 
 
+def prediction_outcome(error: Optional[BaseException]) -> str:
+    if error is None:
+        return "ok"
+    if isinstance(error, Overloaded):
+        return "overloaded"
+    if isinstance(error, (DeadlineExceeded, asyncio.TimeoutError)):
+        return "deadline"
+    return "error"
+
+
+def submit_prediction(description: str, max_tokens: int = 128, timeout: Optional[float] = None) -> Future:
+    # Cache hits resolve immediately; misses go to the batcher and are stored when done
+    cached = prediction_cache.get(description, max_tokens)
+    if cached is not None:
+        PREDICTIONS.inc(outcome="cached")
+        future = Future()
+        future.set_result(cached)
+        return future
+
+    require_model_ready()
+
+    def store_result(done: Future) -> None:
+        if done.cancelled():
+            PREDICTIONS.inc(outcome="cancelled")
+            return
+        PREDICTIONS.inc(outcome=prediction_outcome(done.exception()))
+        if done.exception() is None:
+            prediction_cache.put(description, max_tokens, done.result())
+
+    try:
+        future = batcher.submit(description, max_tokens, timeout)
+    except Overloaded:
+        PREDICTIONS.inc(outcome="overloaded")
+        raise
+    future.add_done_callback(store_result)
+    return future
+
+
 @app.post("/predict-campaign-outcome")
-def predict_campaign_outcome(payload: CampaignInput):
-    result = generate_campaign_prediction(payload.description)
-    return {"prediction": result}
\ No newline at end of file
+async def predict_campaign_outcome(payload: CampaignInput):
+    # Async so a waiting prediction holds no threadpool thread that /filter-campaigns needs
+    try:
+        future = await run_in_threadpool(
+            submit_prediction, payload.description, 128, PREDICTION_TIMEOUT_SECONDS
+        )
+    except Overloaded as e:
+        raise overloaded(e)
+    try:
+        result = await asyncio.wait_for(asyncio.wrap_future(future), PREDICTION_TIMEOUT_SECONDS)
+    except (asyncio.TimeoutError, DeadlineExceeded):
+        raise HTTPException(status_code=504, detail="Prediction did not finish before its deadline.")
+    return {"prediction": result}
+
+
+@app.post("/predict-campaign-outcome/batch")
+async def predict_campaign_outcomes(payload: BulkCampaignInput):
+    if len(payload.descriptions) > MAX_BULK_DESCRIPTIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BULK_DESCRIPTIONS} descriptions per request.",
+        )
+
+    # Descriptions go through the cache and shared batcher a window at a time, so one
+    # bulk request cannot fill the pending queue; lines are streamed as they finish,
+    # so each carries the index of its description
+    window = batcher.max_batch_size * batcher.workers
+    remaining = deque(enumerate(payload.descriptions))
+    futures = {}
+
+    def top_up() -> None:
+        while remaining and len(futures) < window:
+            index, description = remaining[0]
+            try:
+                futures[submit_prediction(description, payload.max_tokens)] = index
+            except Overloaded:
+                # Queue full: retry once something finishes
+                return
+            remaining.popleft()
+
+    async def stream():
+        # Awaits the predictions, so a bulk request holds no threadpool thread while they run
+        waiting = {}
+        try:
+            while futures or remaining:
+                if not futures:
+                    await asyncio.sleep(0.05)
+                    await run_in_threadpool(top_up)
+                    continue
+                submitted = futures.keys() - set(waiting.values())
+                waiting.update({asyncio.wrap_future(future): future for future in submitted})
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = futures.pop(waiting.pop(task))
+                    try:
+                        prediction = task.result()
+                        line = {"index": index, "prediction": prediction, **parse_prediction(prediction)}
+                    except Exception as e:
+                        line = {"index": index, "error": str(e)}
+                    yield json.dumps(line) + "\n"
+                await run_in_threadpool(top_up)
+        finally:
+            # Client went away: don't spend generate() time on unsent results
+            for future in futures:
+                future.cancel()
+
+    # Cache lookups read SQLite, so submissions run off the event loop
+    await run_in_threadpool(top_up)
+    if not futures and payload.descriptions:
+        raise overloaded(Overloaded("no room for this request"))
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/predict-campaign-outcome/stream")
+async def stream_campaign_outcome(payload: CampaignInput, request: Request):
+    # Server-Sent Events: "token" events carry decoded text as it is generated,
+    # then one "done" event with the full prediction and its parsed fields
+    # (SQLite cache lookups and the readiness check run in the threadpool, as in the other routes)
+    cached = await run_in_threadpool(prediction_cache.get, payload.description, 128)
+    if cached is None:
+        await run_in_threadpool(require_model_ready)
+        if batcher.overloaded():
+            PREDICTIONS.inc(outcome="overloaded")
+            raise overloaded(Overloaded(f"{batcher.pending} predictions already pending"))
+
+    async def events():
+        if cached is not None:
+            PREDICTIONS.inc(outcome="cached")
+            yield sse("token", {"text": cached})
+            yield sse("done", {"prediction": cached, **parse_prediction(cached)})
+            return
+
+        # Streams count against the same pending limit and inference slots as the batcher
+        try:
+            batcher.admit()
+        except Overloaded as e:
+            PREDICTIONS.inc(outcome="overloaded")
+            yield sse("error", {"detail": f"Prediction queue is full ({e}); retry shortly."})
+            return
+
+        cancel = threading.Event()
+        tokens = inference.stream_campaign_prediction(
+            payload.description, cancel=cancel, slots=batcher.slots, timeout=PREDICTION_TIMEOUT_SECONDS
+        )
+        parts = []
+        try:
+            async for text in tokens:
+                if await request.is_disconnected():
+                    PREDICTIONS.inc(outcome="cancelled")
+                    return
+                parts.append(text)
+                yield sse("token", {"text": text})
+        except Exception as e:
+            PREDICTIONS.inc(outcome=prediction_outcome(e))
+            yield sse("error", {"detail": str(e)})
+            return
+        finally:
+            # Stops generate() at the next token if we left early
+            cancel.set()
+            await tokens.aclose()
+            batcher.release()
+
+        prediction = "".join(parts).strip()
+        PREDICTIONS.inc(outcome="ok")
+        await run_in_threadpool(prediction_cache.put, payload.description, 128, prediction)
+        yield sse("done", {"prediction": prediction, **parse_prediction(prediction)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,97 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+
+# Opt-in: profiles are only taken when this directory is set
+PROFILE_DIR = os.getenv("CAMPAIGNMIND_PROFILE_DIR")
+# With a profile directory set, requests slower than this are profiled without asking (0 = only on request)
+PROFILE_SLOW_MS = float(os.getenv("CAMPAIGNMIND_PROFILE_SLOW_MS", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("CAMPAIGNMIND_PROFILE_INTERVAL_MS", "5"))
+
+# Threads whose innermost frame is one of these are blocked waiting, not working
+IDLE_FUNCTIONS = {"wait", "select", "poll", "accept"}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack on a timer while active.
+
+    Stacks are counted in the collapsed ``root;caller;callee count`` format that
+    flamegraph.pl, speedscope and inferno read directly. Sampling from a separate
+    thread keeps the profiled code unmodified, so numbers stay close to unprofiled
+    runs, and it also sees the inference worker threads a request is waiting on.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._sample, daemon=True, name="campaignmind-profiler")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _sample(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me or frame.f_code.co_name in IDLE_FUNCTIONS:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def dump(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+
+
+def profile_path(name: str, directory: Optional[str] = PROFILE_DIR) -> str:
+    slug = name.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+    return os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{uuid.uuid4().hex[:8]}.folded")
+
+
+# Every profile samples the whole process, so only one runs at a time
+_active = threading.Lock()
+
+
+def start_profile() -> Optional[SamplingProfiler]:
+    """A running profiler, or None when profiling is off or another profile is running."""
+    if not PROFILE_DIR or not _active.acquire(blocking=False):
+        return None
+    return SamplingProfiler().start()
+
+
+def finish_profile(profiler: SamplingProfiler, path: Optional[str]) -> None:
+    # Writes the profile to ``path`` (None: discard it) and lets the next one start
+    try:
+        profiler.stop()
+        if path is not None:
+            profiler.dump(path)
+    finally:
+        _active.release()
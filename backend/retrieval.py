@@ -0,0 +1,159 @@
+import os
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Column whose text the similar-campaign search indexes
+TEXT_COLUMN = "Campaign_Description"
+
+# Hashed feature space for word unigrams and bigrams; collisions only blur rare terms
+RETRIEVAL_FEATURES = int(os.getenv("CAMPAIGNMIND_RETRIEVAL_FEATURES", str(1 << 20)))
+
+# Ingested batches become segments of their own; past this many, the small ones are merged
+MAX_SEGMENTS = int(os.getenv("CAMPAIGNMIND_RETRIEVAL_SEGMENTS", "8"))
+
+# Words keep inner hyphens and apostrophes, so "18-24" and "30-day" stay whole;
+# the separator alternative marks where one text ends and the next begins
+SEPARATOR = "\x01"
+WORD_PATTERN = re.compile(r"[^\W_]+(?:['-][^\W_]+)*|" + SEPARATOR)
+
+# Mixes the two word hashes of a bigram, so it never lands on either word's feature
+BIGRAM_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def featurize(texts, n_features: int = RETRIEVAL_FEATURES) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Hashed word unigram + bigram counts of each text, as (text, feature, count) triples.
+
+    Sorted by text, then feature. All texts go through one regex pass and one
+    vectorised hash, rather than a Python loop per text.
+    """
+    words = np.array(WORD_PATTERN.findall(SEPARATOR.join(texts).lower()), dtype=object)
+    separators = words == SEPARATOR
+    text = np.cumsum(separators)[~separators]
+    hashes = pd.util.hash_array(words[~separators])
+    pairs = np.flatnonzero(text[1:] == text[:-1])
+    bigrams = hashes[pairs] * BIGRAM_MULTIPLIER + (hashes[pairs + 1] ^ (hashes[pairs + 1] >> np.uint64(31)))
+    text = np.concatenate([text, text[pairs]])
+    features = (np.concatenate([hashes, bigrams]) % np.uint64(n_features)).astype(np.int64)
+    keys, counts = np.unique(text * n_features + features, return_counts=True)
+    return keys // n_features, keys % n_features, counts
+
+
+class TextSegment:
+    """Inverted index over the distinct descriptions of a contiguous run of rows.
+
+    Rows with the same text share one document, whose vector is L2-normalised at
+    build time, so a query's cosine similarity is a dot product over the
+    postings of its own terms; each document then expands to its rows. Without
+    ``idf``, the weights are computed from these rows.
+    """
+
+    def __init__(self, texts: pd.Series, start: int, idf: Optional[np.ndarray] = None, n_features: int = RETRIEVAL_FEATURES):
+        self.start = start
+        self.n_rows = len(texts)
+        codes, uniques = pd.factorize(texts, use_na_sentinel=False)
+        self.codes = codes.astype(np.int32)
+        # A missing description indexes as empty text and matches nothing
+        self.uniques = pd.Series(np.asarray(uniques, dtype=object)).fillna("").to_numpy()
+        # Rows of document d are row_order[row_offsets[d]:row_offsets[d + 1]], oldest first
+        rows_per_doc = np.bincount(self.codes, minlength=len(self.uniques))
+        self.row_order = np.argsort(self.codes, kind="stable").astype(np.int32)
+        self.row_offsets = np.concatenate([[0], np.cumsum(rows_per_doc)])
+
+        docs, features, counts = featurize(self.uniques, n_features if idf is None else len(idf))
+        if idf is None:
+            # Document frequency counts rows, so a description repeated by many campaigns weighs less
+            frequency = np.bincount(features, weights=rows_per_doc[docs], minlength=n_features)
+            idf = np.log((1 + self.n_rows) / (1 + frequency)) + 1
+        self.idf = idf
+        weights = (1 + np.log(counts)) * idf[features]
+        norms = np.sqrt(np.bincount(docs, weights=weights ** 2, minlength=len(self.uniques)))
+        weights /= np.where(norms > 0, norms, 1)[docs]
+
+        # Postings grouped by term; order within a term does not matter
+        by_feature = np.argsort(features)
+        self.terms, first = np.unique(features[by_feature], return_index=True)
+        self.term_offsets = np.append(first, len(by_feature))
+        self.docs = docs[by_feature].astype(np.int32)
+        self.weights = weights[by_feature].astype(np.float32)
+
+    def texts(self) -> np.ndarray:
+        return self.uniques[self.codes]
+
+    def lookup(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Position of each feature among this segment's terms, and whether it is there
+        if not len(self.terms):
+            return np.zeros(len(features), dtype=np.int64), np.zeros(len(features), dtype=bool)
+        pos = np.minimum(np.searchsorted(self.terms, features), len(self.terms) - 1)
+        return pos, self.terms[pos] == features
+
+    def search(self, pos: np.ndarray, hit: np.ndarray, weights: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Up to ``k`` (similarity, row) pairs, best first; rows are snapshot positions."""
+        if not hit.any():
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        # The postings of every query term back to back, each weighted by that term
+        spans = [slice(self.term_offsets[p], self.term_offsets[p + 1]) for p in pos[hit]]
+        scores = np.bincount(
+            np.concatenate([self.docs[span] for span in spans]),
+            weights=np.concatenate([self.weights[span] * w for span, w in zip(spans, weights[hit])]),
+            minlength=len(self.uniques),
+        )
+
+        # Every document has at least one row, so the best k documents cover k rows
+        top = np.flatnonzero(scores > 0)
+        if len(top) > k:
+            top = top[np.argpartition(-scores[top], k - 1)[:k]]
+        top = top[np.lexsort((top, -scores[top]))]
+        rows = [self.row_order[self.row_offsets[d]:self.row_offsets[d + 1]] for d in top]
+        sizes = np.array([len(r) for r in rows])
+        rows = np.concatenate(rows)[:k].astype(np.int64) + self.start
+        return np.repeat(scores[top], sizes)[:k], rows
+
+
+class SimilarityIndex:
+    """TF-IDF search over campaign descriptions for the most similar past campaigns.
+
+    IDF weights come from the rows the index was built on; ingested rows are
+    added as new segments under the same weights, in time proportional to the
+    batch, until the next load rebuilds the whole index. Search takes the top
+    ``k`` of every segment and merges them.
+    """
+
+    def __init__(self, texts: pd.Series, n_features: int = RETRIEVAL_FEATURES):
+        segment = TextSegment(texts, 0, n_features=n_features)
+        self.idf = segment.idf
+        self.n_rows = len(texts)
+        self.segments: List[TextSegment] = [segment]
+
+    def extend(self, texts: pd.Series) -> "SimilarityIndex":
+        """Index over these rows followed by ``texts``; this index is left unchanged."""
+        extended = SimilarityIndex.__new__(SimilarityIndex)
+        extended.idf = self.idf
+        extended.n_rows = self.n_rows + len(texts)
+        segments = self.segments + [TextSegment(texts, self.n_rows, self.idf)]
+        if len(segments) > MAX_SEGMENTS:
+            # Keep the big load-time segment, rebuild everything ingested since as one
+            tail = segments[1:]
+            merged = pd.Series(np.concatenate([s.texts() for s in tail]), dtype=object)
+            segments = [segments[0], TextSegment(merged, tail[0].start, self.idf)]
+        extended.segments = segments
+        return extended
+
+    def search(self, text: str, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """The ``k`` rows whose descriptions are most similar to ``text``, as
+        (cosine similarity, row position) arrays, best first; ties go to older rows."""
+        _, features, counts = featurize([text], len(self.idf))
+        weights = (1 + np.log(counts)) * self.idf[features]
+        found = [segment.lookup(features) for segment in self.segments]
+        # Words no campaign uses cannot match, so they are left out of the query's norm
+        known = np.logical_or.reduce([hit for _, hit in found])
+        norm = np.sqrt((weights[known] ** 2).sum())
+        if not norm:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        results = [segment.search(pos, hit, weights / norm, k) for segment, (pos, hit) in zip(self.segments, found)]
+        scores = np.concatenate([s for s, _ in results])
+        rows = np.concatenate([r for _, r in results])
+        best = np.lexsort((rows, -scores))[:k]
+        return scores[best], rows[best]
@@ -0,0 +1,66 @@
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.dataset import DatasetSnapshot, get_dataset
+from backend.filters import SUMMARY_KPIS
+from backend.retrieval import TEXT_COLUMN
+from telemetry.metrics import stage
+
+# Similar campaigns returned when the request does not say, and at most
+SIMILAR_K = int(os.getenv("CAMPAIGNMIND_SIMILAR_K", "10"))
+MAX_SIMILAR_K = int(os.getenv("CAMPAIGNMIND_MAX_SIMILAR_K", "100"))
+
+# Columns reported for each similar campaign, next to its similarity
+CAMPAIGN_COLUMNS = [
+    "Campaign_ID",
+    TEXT_COLUMN,
+    "Channel_Used",
+    "Campaign_Goal",
+    "Target_Audience",
+    "Customer_Segment",
+    "Location",
+    "Date",
+    "ROI",
+    "Conversion_Rate",
+    "CTR",
+    "Engagement_Score",
+    "Success_Label",
+]
+
+
+def _column_values(values: pd.Series) -> List[Any]:
+    # Plain JSON values: ISO dates, strings for categories, Python numbers
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.strftime("%Y-%m-%d").tolist()
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(str).tolist()
+    return values.tolist()
+
+
+def similar_campaigns(description: str, k: int = SIMILAR_K, snapshot: Optional[DatasetSnapshot] = None) -> Dict[str, Any]:
+    """The ``k`` past campaigns whose descriptions are closest to ``description``,
+    with their actual KPIs, and the same headline averages as the explorer over them."""
+    snapshot = snapshot or get_dataset()
+    with stage("similar_search"):
+        scores, rows = snapshot.retrieval.search(description, k)
+    if not len(rows):
+        response = {"message": "No past campaign shares words with this description."}
+        response.update({key: None for key, _, _ in SUMMARY_KPIS})
+        response["similar_campaigns"] = []
+        return response
+
+    with stage("similar_respond"):
+        matches = snapshot.take(rows)
+        response = {"message": "Success"}
+        for key, metric, decimals in SUMMARY_KPIS:
+            response[key] = float(np.round(matches[metric].mean(), decimals))
+        columns = [col for col in CAMPAIGN_COLUMNS if col in matches.columns]
+        values = {col: _column_values(matches[col]) for col in columns}
+        response["similar_campaigns"] = [
+            {"similarity": round(float(score), 4), **{col: values[col][i] for col in columns}}
+            for i, score in enumerate(scores)
+        ]
+        return response
@@ -0,0 +1,99 @@
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Histogram bins per metric; a metric with at most this many distinct values
+# (scores, whole-percent rates) gets one bin per value and exact percentiles
+SKETCH_BINS = int(os.getenv("CAMPAIGNMIND_SKETCH_BINS", "64"))
+
+# Percentiles reported for every group of a breakdown
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Rows sampled to place bin boundaries on large datasets
+EDGE_SAMPLE_ROWS = 1_000_000
+
+
+class SketchLayout:
+    """Histogram bins shared by every cell, one range of bins per metric.
+
+    Histograms over the same bins merge by adding counts, so per-cell
+    histograms roll up through the cube like sums and counts: a distribution
+    for any selection and breakdown costs O(cells x bins), never O(rows).
+    Continuous metrics get equal-depth bins over the whole dataset, which
+    bounds percentile error by one bin; discrete ones are exact.
+    """
+
+    def __init__(self, df: pd.DataFrame, metrics: List[str], bins: int = SKETCH_BINS):
+        self.metrics = metrics
+        self.exact: Dict[str, bool] = {}
+        # Interior bin boundaries (a value equal to one falls in the lower bin)
+        self.cuts: Dict[str, np.ndarray] = {}
+        # Finite outer edges as well, len(cuts) + 2 of them, for interpolation and display
+        self.edges: Dict[str, np.ndarray] = {}
+        # For exact metrics, the value each bin holds
+        self.points: Dict[str, np.ndarray] = {}
+        self.slices: Dict[str, slice] = {}
+        offset = 0
+        for metric in metrics:
+            values = df[metric].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)][::max(1, len(values) // EDGE_SAMPLE_ROWS)]
+            distinct = np.unique(values)
+            if len(distinct) == 0:
+                distinct = np.zeros(1)
+            if len(distinct) <= bins:
+                # One bin per value, bounded halfway to its neighbours
+                cuts = (distinct[:-1] + distinct[1:]) / 2
+                below = distinct[0] - (cuts[0] - distinct[0] if len(cuts) else 0.5)
+                above = distinct[-1] + (distinct[-1] - cuts[-1] if len(cuts) else 0.5)
+                edges = np.concatenate([[below], cuts, [above]])
+                self.points[metric] = distinct
+                self.exact[metric] = True
+            else:
+                cuts = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+                edges = np.concatenate([[distinct[0]], cuts, [distinct[-1]]])
+                self.exact[metric] = False
+            self.cuts[metric] = cuts
+            self.edges[metric] = edges
+            self.slices[metric] = slice(offset, offset + len(cuts) + 1)
+            offset += len(cuts) + 1
+        self.n_bins = offset
+
+    def bin_index(self, metric: str, values: np.ndarray) -> np.ndarray:
+        """Bin of each value within ``metric``'s range; values outside it land in the end bins."""
+        return np.searchsorted(self.cuts[metric], values, side="left")
+
+    def percentiles(self, metric: str, counts: np.ndarray, low: float, high: float) -> np.ndarray:
+        """``PERCENTILES`` from a histogram, interpolated like ``numpy.percentile``.
+
+        Exact metrics read ranks straight off the counts; continuous ones treat
+        the values in a bin as evenly spread between its edges, clipped to the
+        group's ``low``/``high`` (which are exact).
+        """
+        cumulative = np.cumsum(counts)
+        ranks = np.array(PERCENTILES) / 100 * (cumulative[-1] - 1)
+        below = np.floor(ranks)
+        first = self._value_at(metric, counts, cumulative, below, low, high)
+        second = self._value_at(metric, counts, cumulative, np.minimum(below + 1, cumulative[-1] - 1), low, high)
+        return first + (ranks - below) * (second - first)
+
+    def _value_at(self, metric: str, counts, cumulative, ranks: np.ndarray, low: float, high: float) -> np.ndarray:
+        # Value of each ``ranks``-th smallest row (0-based)
+        b = np.searchsorted(cumulative, ranks, side="right")
+        if self.exact[metric]:
+            return np.clip(self.points[metric][b], low, high)
+        edges = self.edges[metric]
+        # The end bins are open-ended; the group's exact min/max bound them instead
+        lo = np.where(b == 0, low, np.maximum(edges[b], low))
+        hi = np.where(b == len(counts) - 1, high, np.minimum(edges[np.minimum(b + 1, len(edges) - 1)], high))
+        start = cumulative[b] - counts[b]
+        return np.clip(lo + (ranks - start + 0.5) / counts[b] * (hi - lo), low, high)
+
+    def summary(self, metric: str, counts: np.ndarray, low: float, high: float, decimals: int) -> Dict[str, Any]:
+        summary = {"count": int(counts.sum()), "min": round(float(low), decimals)}
+        for q, value in zip(PERCENTILES, self.percentiles(metric, counts, low, high).tolist()):
+            summary[f"p{q}"] = round(value, decimals)
+        summary["max"] = round(float(high), decimals)
+        summary["histogram"] = counts.tolist()
+        return summary
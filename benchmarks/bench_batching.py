@@ -0,0 +1,57 @@
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.synthetic_data import generate_campaigns
+from models.batching import MicroBatcher
+from models.inference import generate_campaign_prediction, generate_campaign_predictions
+from telemetry.metrics import percentile
+
+
+def run_load(predict, descriptions, concurrency, max_tokens):
+    # Each client thread issues requests back to back, like the FastAPI threadpool would
+    def timed(description):
+        start = time.perf_counter()
+        predict(description, max_tokens)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, descriptions))
+    elapsed = time.perf_counter() - start
+    return {
+        "throughput": len(descriptions) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request generate() vs dynamic micro-batching")
+    parser.add_argument("--requests", type=int, default=128)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    descriptions = generate_campaigns(args.requests, seed=7)["Campaign_Description"].tolist()
+    generate_campaign_prediction(descriptions[0], args.max_tokens)  # warm up
+
+    batcher = MicroBatcher(generate_campaign_predictions, args.max_batch_size, args.max_wait_ms)
+    batcher.start()
+
+    print(f"{'mode':<10}{'clients':>8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}")
+    try:
+        for concurrency in args.concurrency:
+            for name, predict in (("direct", generate_campaign_prediction), ("batched", batcher.predict)):
+                r = run_load(predict, descriptions, concurrency, args.max_tokens)
+                print(f"{name:<10}{concurrency:>8}{r['throughput']:>9.1f}{r['p50_ms']:>9.0f}{r['p99_ms']:>9.0f}")
+    finally:
+        batcher.stop()
+
+
+if __name__ == "__main__":
+    main()
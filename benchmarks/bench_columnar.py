@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from backend.columnar import write_columnar
+from backend.dataset import file_digest, load_data
+from benchmarks.synthetic_data import ensure_csv
+
+
+def memory_status() -> dict:
+    # Private (anonymous) vs file-backed resident memory, in MiB (Linux only)
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0]) / 1024
+    return fields
+
+
+def child(path: str) -> None:
+    # Runs in a fresh interpreter so each measurement starts from a cold process
+    from backend.dataset import build_snapshot
+
+    start = time.perf_counter()
+    df = load_data(path)
+    loaded = time.perf_counter()
+    snapshot = build_snapshot(df, "bench", 0.0, 0)
+    ready = time.perf_counter()
+
+    # Touch the columns the explorer reads so mapped pages count toward RSS
+    snapshot.cube.rollup({"Channel_Used": ["Instagram"]})
+    float(df["ROI"].sum())
+
+    print(json.dumps({
+        "load_s": round(loaded - start, 3),
+        "ready_s": round(ready - start, 3),
+        **{k: round(v, 1) for k, v in memory_status().items()},
+    }))
+
+
+def measure(path: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_columnar", "--child", path],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time and RSS: CSV vs memory-mapped columnar store")
+    parser.add_argument("--rows", type=int, nargs="+", default=[300_000, 5_000_000])
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    print(f"{'rows':>10} {'format':<9}{'load s':>8}{'ready s':>9}{'RSS MiB':>9}{'anon MiB':>10}{'file MiB':>10}")
+    for n_rows in args.rows:
+        csv_path = ensure_csv(n_rows, args.data_dir)
+        columns_path = os.path.splitext(csv_path)[0] + ".columns"
+        if not os.path.exists(columns_path):
+            write_columnar(load_data(csv_path), columns_path, version=file_digest(csv_path))
+
+        for name, path in (("csv", csv_path), ("columnar", columns_path)):
+            r = measure(path)
+            print(
+                f"{n_rows:>10} {name:<9}{r['load_s']:>8.2f}{r['ready_s']:>9.2f}"
+                f"{r['VmRSS']:>9.0f}{r['RssAnon']:>10.0f}{r['RssFile']:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import time
+
+from backend.dataset import FILTER_COLUMNS, METRIC_COLUMNS, load_data
+from backend.filters import GROUP_COLUMNS
+from backend.index import BitmapIndex
+from benchmarks.synthetic_data import ensure_csv
+
+# Representative explorer selections, from unfiltered to all six dimensions
+SELECTIONS = {
+    "single_channel": {"Channel_Used": ["Instagram"]},
+    "two_channels_one_quarter": {"Channel_Used": ["Instagram", "Twitter"], "Year_Quarter": ["2022Q1"]},
+    "goal_segment_location": {
+        "Campaign_Goal": ["Product Launch"],
+        "Customer_Segment": ["Food"],
+        "Location": ["Austin", "Miami"],
+    },
+    "all_dimensions": {
+        "Channel_Used": ["Facebook", "Pinterest"],
+        "Campaign_Goal": ["Increase Sales"],
+        "Target_Audience": ["Men 25-34", "Women 25-34", "All Ages"],
+        "Customer_Segment": ["Technology"],
+        "Year_Quarter": ["2022Q2", "2022Q3"],
+        "Location": ["New York", "Las Vegas"],
+    },
+}
+
+
+def chained_filter(df, selection):
+    # The pre-index implementation: one full-column scan and one copy per filter
+    for col, values in selection.items():
+        if len(values) == 1:
+            df = df[df[col] == values[0]]
+        else:
+            df = df[df[col].isin(values)]
+    return df
+
+
+def indexed_filter(df, index, selection):
+    rows = index.select(selection)
+    return df[METRIC_COLUMNS + GROUP_COLUMNS].take(rows)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bitmap index vs chained boolean filtering")
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    args = parser.parse_args()
+
+    df = load_data(ensure_csv(args.rows, args.data_dir))
+    start = time.perf_counter()
+    index = BitmapIndex(df, FILTER_COLUMNS)
+    print(f"Index build: {(time.perf_counter() - start) * 1000:.1f} ms for {len(df)} rows")
+
+    print(f"{'selection':<28}{'rows':>9}{'chained ms':>12}{'select ms':>11}{'gather ms':>11}{'speedup':>9}")
+    for name, selection in SELECTIONS.items():
+        expected = chained_filter(df, selection)
+        assert index.select(selection).tolist() == df.index.get_indexer(expected.index).tolist()
+
+        chained = best_of(lambda: chained_filter(df, selection), args.repeat)
+        select = best_of(lambda: index.select(selection), args.repeat)
+        gather = best_of(lambda: indexed_filter(df, index, selection), args.repeat)
+        print(
+            f"{name:<28}{len(expected):>9}{chained * 1000:>12.2f}{select * 1000:>11.3f}"
+            f"{gather * 1000:>11.2f}{chained / gather:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
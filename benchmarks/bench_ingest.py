@@ -0,0 +1,46 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from backend.dataset import DatasetStore, build_snapshot, load_data
+from benchmarks.synthetic_data import ensure_csv, generate_campaigns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental ingest vs rewriting the CSV and reloading it")
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--batches", type=int, nargs="+", default=[10, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "campaigns.csv")
+        shutil.copy(ensure_csv(args.rows, args.data_dir), path)
+        store = DatasetStore(path, log_dir=os.path.join(tmp, "ingest"), compact_rows=0)
+        store.get()
+        # The first ingest allocates the appendable buffers
+        store.ingest(generate_campaigns(1, seed=1).astype(str))
+
+        print(f"{'batch':>7}{'ingest ms':>11}{'reload ms':>11}{'speedup':>9}")
+        for batch in args.batches:
+            rows = generate_campaigns(batch, seed=batch).astype(str)
+            ingest = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                store.ingest(rows)
+                ingest.append(time.perf_counter() - start)
+
+            # The old way: append to the CSV, then parse it and rebuild everything
+            start = time.perf_counter()
+            rows.to_csv(path, mode="a", header=False, index=False)
+            build_snapshot(load_data(path), "bench", 0.0, 0)
+            reload = time.perf_counter() - start
+            print(f"{batch:>7}{min(ingest) * 1000:>11.1f}{reload * 1000:>11.1f}{reload / min(ingest):>8.1f}x")
+        print(f"Resident rows after the run: {store.get().n_rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.dataset import load_data
+from backend.retrieval import TEXT_COLUMN, WORD_PATTERN, SimilarityIndex
+from benchmarks.synthetic_data import ensure_csv, generate_campaigns
+
+
+def make_queries(n: int) -> list:
+    # Paraphrases of unseen campaigns: reordered, lower-cased, segment left out
+    df = generate_campaigns(n, seed=3)
+    return (
+        df["Duration"].astype(str) + "-day " + df["Channel_Used"].str.lower() + " "
+        + df["Campaign_Goal"].str.lower() + " campaign for " + df["Target_Audience"] + " in " + df["Location"]
+    ).tolist()
+
+
+def query_words(query: str) -> list:
+    return sorted(set(WORD_PATTERN.findall(query.lower())))
+
+
+def brute_force(texts: pd.Series, query: str, k: int) -> np.ndarray:
+    # The pre-index way: count the query words each description contains, keep the best k
+    score = sum(texts.str.contains(word, regex=False).to_numpy(dtype=np.int64) for word in query_words(query))
+    return np.argsort(-score, kind="stable")[:k]
+
+
+def word_overlap(texts: pd.Series, rows: np.ndarray, query: str) -> float:
+    # Share of the query's words found in the returned descriptions, on average
+    words = query_words(query)
+    return float(np.mean([sum(w in texts.iloc[r] for w in words) / len(words) for r in rows]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Similar-campaign index vs brute-force pandas string matching")
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--unique", action="store_true", help="Make every description distinct (worst case for the index)")
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    args = parser.parse_args()
+
+    df = load_data(ensure_csv(args.rows, args.data_dir))
+    texts = df[TEXT_COLUMN].astype(str)
+    if args.unique:
+        texts = texts + " ref " + df["Campaign_ID"].astype(str) + "-" + pd.Series(np.arange(len(df))).astype(str)
+    start = time.perf_counter()
+    index = SimilarityIndex(texts)
+    print(f"Index build: {(time.perf_counter() - start) * 1000:.0f} ms for {len(df)} rows, {texts.nunique()} distinct descriptions")
+
+    lowered = texts.str.lower()
+    print(f"{'query':<62}{'brute ms':>10}{'index ms':>10}{'speedup':>9}{'overlap':>15}")
+    for query in make_queries(args.queries):
+        start = time.perf_counter()
+        expected = brute_force(lowered, query, args.k)
+        brute = time.perf_counter() - start
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            _, rows = index.search(query, args.k)
+            timings.append(time.perf_counter() - start)
+        indexed = min(timings)
+        overlap = f"{word_overlap(lowered, expected, query):.2f} / {word_overlap(lowered, rows, query):.2f}"
+        print(f"{query[:60]:<62}{brute * 1000:>10.1f}{indexed * 1000:>10.2f}{brute / indexed:>8.0f}x{overlap:>15}")
+    print("overlap: share of query words in the top k, brute force / index")
+
+
+if __name__ == "__main__":
+    main()
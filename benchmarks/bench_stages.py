@@ -0,0 +1,182 @@
+import argparse
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from backend.aggregation import aggregate
+from backend.columnar import write_columnar
+from backend.cube import frame_codes, frame_labels
+from backend.dataset import METRIC_COLUMNS, build_snapshot, file_digest, load_data
+from backend.filters import FILTER_DIMENSIONS, GROUP_COLUMNS, build_response, build_selection, cube_response, rows_response
+from benchmarks.results import result, summarize, write_results
+from benchmarks.synthetic_data import ensure_csv, generate_campaigns
+
+# FilterRequest shapes: how many values each field holds (goal and segment take one)
+FILTER_SHAPES = {
+    "empty": {},
+    "channel_1": {"channel": 1},
+    "channel_3": {"channel": 3},
+    "goal": {"goal": 1},
+    "audience_4_quarter_2": {"audience": 4, "quarter": 2},
+    "goal_segment_location_2": {"goal": 1, "segment": 1, "location": 2},
+    "all_fields_1": {"channel": 1, "goal": 1, "audience": 1, "segment": 1, "quarter": 1, "location": 1},
+    "all_fields_wide": {"channel": 3, "goal": 1, "audience": 6, "segment": 1, "quarter": 3, "location": 4},
+}
+
+SINGLE_VALUE_FIELDS = ("goal", "segment")
+
+
+def field_values(df) -> Dict[str, List[str]]:
+    """Sorted values of every FilterRequest field, from the dataset itself."""
+    return {field: sorted(map(str, df[col].dropna().unique())) for field, col in FILTER_DIMENSIONS.items()}
+
+
+def filter_request(shape: Dict[str, int], values: Dict[str, List[str]], rng: Optional[np.random.Generator] = None):
+    # The first n values of each field, or a random n of them when ``rng`` is given
+    request = {}
+    for field, n in shape.items():
+        options = values[field]
+        n = min(n, len(options))
+        chosen = list(rng.choice(options, n, replace=False)) if rng is not None else options[:n]
+        request[field] = str(chosen[0]) if field in SINGLE_VALUE_FIELDS else [str(v) for v in chosen]
+    return request
+
+
+def time_calls(fn: Callable[[], Any], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_load_stages(n_rows: int, data_dir: str) -> List[Dict[str, Any]]:
+    csv_path = ensure_csv(n_rows, data_dir)
+    columns_path = os.path.splitext(csv_path)[0] + ".columns"
+    results = []
+
+    start = time.perf_counter()
+    df = load_data(csv_path)
+    csv_seconds = time.perf_counter() - start
+    if not os.path.exists(columns_path):
+        write_columnar(df, columns_path, version=file_digest(csv_path))
+
+    start = time.perf_counter()
+    snapshot = build_snapshot(df, "bench", 0.0, 0)
+    snapshot_seconds = time.perf_counter() - start
+    results.append(result("load", {"rows": n_rows, "format": "csv"}, {
+        "load_s": round(csv_seconds, 4), "snapshot_s": round(snapshot_seconds, 4),
+    }))
+
+    start = time.perf_counter()
+    df = load_data(columns_path)
+    columnar_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    build_snapshot(df, "bench", 0.0, 0)
+    results.append(result("load", {"rows": n_rows, "format": "columnar"}, {
+        "load_s": round(columnar_seconds, 4), "snapshot_s": round(time.perf_counter() - start, 4),
+    }))
+    return results
+
+
+def run_filter_stages(n_rows: int, data_dir: str, repeat: int) -> List[Dict[str, Any]]:
+    """Per-stage latency of /filter-campaigns for every shape in FILTER_SHAPES.
+
+    ``select``, ``gather``, ``aggregate`` and ``respond`` are the steps of the rows
+    engine; ``engine_rows`` and ``engine_cube`` are each engine end to end.
+    """
+    df = load_data(ensure_csv(n_rows, data_dir))
+    snapshot = build_snapshot(df, "bench", 0.0, 0)
+    values = field_values(df)
+    all_codes = frame_codes(df, GROUP_COLUMNS)
+    all_values = {metric: df[metric].to_numpy() for metric in METRIC_COLUMNS}
+    labels = frame_labels(df, GROUP_COLUMNS)
+
+    results = []
+    for name, shape in FILTER_SHAPES.items():
+        selection = build_selection(**filter_request(shape, values))
+        rows = snapshot.index.select(selection)
+
+        def gather():
+            if rows is None:
+                return all_codes, all_values
+            return (
+                {col: c[rows] for col, c in all_codes.items()},
+                {metric: v[rows] for metric, v in all_values.items()},
+            )
+
+        codes, metrics = gather()
+        cells = aggregate(codes, labels, metrics)
+        stages = {
+            "select": lambda: snapshot.index.select(selection),
+            "gather": gather,
+            "aggregate": lambda: aggregate(codes, labels, metrics),
+            "respond": lambda: build_response(cells),
+            "engine_rows": lambda: rows_response(snapshot, selection),
+            "engine_cube": lambda: cube_response(snapshot, selection),
+        }
+        matched = len(df) if rows is None else len(rows)
+        for stage, fn in stages.items():
+            fn()  # warm up
+            metrics_ms = summarize(time_calls(fn, repeat))
+            results.append(result("filter", {"rows": n_rows, "shape": name, "stage": stage}, {
+                "matched_rows": matched, **metrics_ms,
+            }))
+    return results
+
+
+def run_predict_stages(repeat: int, max_tokens: int, batch_size: int = 8) -> List[Dict[str, Any]]:
+    # Uses whatever model the CAMPAIGNMIND_* settings point at (e.g. the tiny stand-in)
+    from models import inference
+
+    start = time.perf_counter()
+    inference.load_model()
+    load_seconds = time.perf_counter() - start
+    descriptions = generate_campaigns(repeat * batch_size, seed=11)["Campaign_Description"].tolist()
+
+    single = time_calls(lambda it=iter(descriptions): inference.generate_campaign_prediction(next(it), max_tokens), repeat)
+    batches = iter([descriptions[i:i + batch_size] for i in range(0, len(descriptions), batch_size)])
+    batched = time_calls(lambda: inference.generate_campaign_predictions(next(batches), max_tokens), repeat)
+
+    status = inference.model_status()
+    params = {"backend": status["backend"], "source": status["source"], "max_tokens": max_tokens}
+    return [
+        result("predict", {**params, "stage": "load"}, {"load_s": round(load_seconds, 4)}),
+        result("predict", {**params, "stage": "single"}, summarize(single)),
+        result("predict", {**params, "stage": f"batch_{batch_size}"}, {
+            **summarize(batched),
+            "descriptions_per_s": round(batch_size * len(batched) / sum(batched), 2),
+        }),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load / filter / aggregate stage micro-benchmarks")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    parser.add_argument("--output", help="Write results (JSON) here")
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in args.rows:
+        results += run_load_stages(n_rows, args.data_dir)
+        results += run_filter_stages(n_rows, args.data_dir, args.repeat)
+
+    print(f"{'rows':>10} {'shape':<26}{'stage':<13}{'matched':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for r in results:
+        p, m = r["params"], r["metrics"]
+        if r["benchmark"] == "load":
+            print(f"{p['rows']:>10} load {p['format']:<21}{'':<13}{'':>9}{m['load_s'] * 1000:>9.1f}  (+{m['snapshot_s'] * 1000:.1f} ms snapshot)")
+        else:
+            print(f"{p['rows']:>10} {p['shape']:<26}{p['stage']:<13}{m['matched_rows']:>9}{m['p50_ms']:>9.3f}{m['p95_ms']:>9.3f}{m['p99_ms']:>9.3f}")
+    if args.output:
+        write_results(args.output, results, vars(args))
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
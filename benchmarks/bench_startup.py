@@ -0,0 +1,62 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+
+def child(mode: str) -> None:
+    # Runs in a fresh interpreter so every measurement is a cold start
+    start = time.perf_counter()
+    if mode == "import":
+        import backend.main  # noqa: F401
+        print(json.dumps({"seconds": round(time.perf_counter() - start, 3)}))
+        return
+
+    from models import inference
+    inference.load_model(use_merged=(mode == "merged"))
+    status = inference.model_status()
+    print(json.dumps({
+        "seconds": round(time.perf_counter() - start, 3),
+        "load_seconds": status["load_seconds"],
+        "warmup_seconds": status["warmup_seconds"],
+        "source": status["source"],
+    }))
+
+
+def measure(mode: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", mode],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend and model startup time")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    # Make sure the merged checkpoint exists before timing the merged path
+    from models import inference
+    inference.export_merged_model()
+
+    print(f"{'phase':<34}{'best s':>8}{'load s':>8}{'warmup s':>10}")
+    phases = (
+        ("import backend.main", "import"),
+        ("model ready: base + LoRA merge", "adapter"),
+        ("model ready: merged checkpoint", "merged"),
+    )
+    for label, mode in phases:
+        runs = [measure(mode) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r["seconds"])
+        print(f"{label:<34}{best['seconds']:>8.2f}{best.get('load_seconds') or 0:>8.2f}{best.get('warmup_seconds') or 0:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from benchmarks.bench_stages import FILTER_SHAPES, field_values, filter_request
+from benchmarks.results import result, summarize, write_results
+from benchmarks.synthetic_data import ensure_csv, generate_campaigns
+
+ROUTES = {
+    "filter": "/filter-campaigns",
+    "predict": "/predict-campaign-outcome",
+}
+
+
+class Client:
+    """One keep-alive connection per load-generator thread."""
+
+    def __init__(self, url: str, timeout: float):
+        parsed = urlparse(url)
+        self.host, self.port, self.timeout = parsed.hostname, parsed.port or 80, timeout
+        self.conn: Optional[http.client.HTTPConnection] = None
+
+    def post(self, path: str, payload: Dict[str, Any]) -> int:
+        body = json.dumps(payload)
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request("POST", path, body, {"Content-Type": "application/json"})
+                response = self.conn.getresponse()
+                response.read()
+                return response.status
+            except (http.client.HTTPException, OSError):
+                # Server closed an idle keep-alive connection: reconnect once
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+        return 0
+
+
+def run_level(url: str, path: str, payloads: List[Dict[str, Any]], concurrency: int, timeout: float) -> Dict[str, Any]:
+    # ``concurrency`` closed-loop clients send the payloads back to back
+    payload_iter = iter(payloads)
+    lock = threading.Lock()
+
+    def worker() -> List[Tuple[float, int]]:
+        client = Client(url, timeout)
+        samples = []
+        while True:
+            with lock:
+                payload = next(payload_iter, None)
+            if payload is None:
+                return samples
+            start = time.perf_counter()
+            try:
+                status = client.post(path, payload)
+            except (http.client.HTTPException, OSError):
+                status = 0
+            samples.append((time.perf_counter() - start, status))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = [s for f in [pool.submit(worker) for _ in range(concurrency)] for s in f.result()]
+    elapsed = time.perf_counter() - start
+
+    ok = [t for t, status in samples if 200 <= status < 300]
+    return {
+        "requests": len(samples),
+        "ok": len(ok),
+        "statuses": dict(Counter(str(status) for _, status in samples)),
+        "throughput_per_s": round(len(ok) / elapsed, 2),
+        **summarize(ok),
+    }
+
+
+def filter_payloads(n: int, values: Dict[str, List[str]], seed: int) -> List[Dict[str, Any]]:
+    # Cycle through the shapes with random values, so most requests miss the query cache
+    rng = np.random.default_rng(seed)
+    shapes = list(FILTER_SHAPES.values())
+    return [filter_request(shapes[i % len(shapes)], values, rng) for i in range(n)]
+
+
+def predict_payloads(n: int, seed: int) -> List[Dict[str, Any]]:
+    # Fresh synthetic descriptions per level; repeats would only measure the prediction cache
+    df = generate_campaigns(n, seed)
+    return [{"description": f"{d} #{seed}-{i}"} for i, d in enumerate(df["Campaign_Description"])]
+
+
+def wait_until_ready(url: str, need_model: bool, timeout: float) -> None:
+    parsed = urlparse(url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=5)
+            conn.request("GET", "/health/inference" if need_model else "/health")
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            if response.status == 200:
+                return
+        except (OSError, ValueError, http.client.HTTPException):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {url} not ready after {timeout:.0f}s")
+
+
+def start_server(data_path: str, port: int, env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, "CAMPAIGNMIND_DATA_PATH": data_path, **(env or {})},
+    )
+
+
+def run_http(
+    url: str,
+    routes: List[str],
+    concurrency: List[int],
+    requests: Dict[str, int],
+    values: Dict[str, List[str]],
+    params: Dict[str, Any],
+    timeout: float = 120.0,
+) -> List[Dict[str, Any]]:
+    results = []
+    for route in routes:
+        for level in concurrency:
+            if route == "filter":
+                payloads = filter_payloads(requests[route], values, seed=level)
+            else:
+                payloads = predict_payloads(requests[route], seed=level)
+            metrics = run_level(url, ROUTES[route], payloads, level, timeout)
+            results.append(result("http", {**params, "route": route, "concurrency": level}, metrics))
+    return results
+
+
+def run_with_server(
+    data_path: str,
+    routes: List[str],
+    concurrency: List[int],
+    requests: Dict[str, int],
+    params: Dict[str, Any],
+    port: int = 8765,
+    env: Optional[Dict[str, str]] = None,
+    values: Optional[Dict[str, List[str]]] = None,
+) -> List[Dict[str, Any]]:
+    """Start uvicorn on ``data_path``, load it, and stop it again."""
+    url = f"http://127.0.0.1:{port}"
+    # A fresh prediction cache per run, or repeated runs would only measure cache hits
+    cache_dir = tempfile.TemporaryDirectory()
+    env = {"CAMPAIGNMIND_PREDICTION_CACHE_PATH": os.path.join(cache_dir.name, "predictions.sqlite3"), **(env or {})}
+    server = start_server(data_path, port, env)
+    try:
+        wait_until_ready(url, need_model="predict" in routes, timeout=600)
+        if values is None:
+            from backend.dataset import load_data
+            values = field_values(load_data(data_path))
+        return run_http(url, routes, concurrency, requests, values, params)
+    finally:
+        server.terminate()
+        server.wait()
+        cache_dir.cleanup()
+
+
+def default_values() -> Dict[str, List[str]]:
+    # Field values of the synthetic data, for runs against an already running server
+    return field_values(generate_campaigns(10_000, seed=0))
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'route':<9}{'clients':>8}{'ok':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses")
+    for r in results:
+        p, m = r["params"], r["metrics"]
+        print(
+            f"{p['route']:<9}{p['concurrency']:>8}{m['ok']:>7}{m['throughput_per_s']:>9.1f}"
+            f"{m.get('p50_ms', 0):>9.1f}{m.get('p95_ms', 0):>9.1f}{m.get('p99_ms', 0):>9.1f}  {m['statuses']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent HTTP load against /filter-campaigns and /predict-campaign-outcome")
+    parser.add_argument("--url", help="Target a running server instead of starting one")
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic dataset size when starting a server")
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    parser.add_argument("--routes", nargs="+", choices=sorted(ROUTES), default=["filter", "predict"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--filter-requests", type=int, default=2000)
+    parser.add_argument("--predict-requests", type=int, default=200)
+    parser.add_argument("--output", help="Write results (JSON) here")
+    args = parser.parse_args()
+
+    requests = {"filter": args.filter_requests, "predict": args.predict_requests}
+    if args.url:
+        wait_until_ready(args.url, need_model="predict" in args.routes, timeout=600)
+        results = run_http(args.url, args.routes, args.concurrency, requests, default_values(), {"target": args.url})
+    else:
+        data_path = ensure_csv(args.rows, args.data_dir)
+        results = run_with_server(data_path, args.routes, args.concurrency, requests, {"rows": args.rows})
+
+    print_results(results)
+    if args.output:
+        write_results(args.output, results, vars(args))
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from telemetry.metrics import percentile
+
+# Each result is {"benchmark": name, "params": {...}, "metrics": {...}}; two runs are
+# compared metric by metric for results with the same benchmark and params
+SCHEMA_VERSION = 1
+
+# Metrics checked for regressions; means and maxima are recorded but too noisy to gate on
+COMPARED_METRICS = ("p50_ms", "p95_ms", "p99_ms", "load_s", "snapshot_s", "throughput_per_s", "descriptions_per_s")
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds from a list of durations in seconds."""
+    if not latencies:
+        return {"count": 0}
+    ms = [t * 1000 for t in latencies]
+    return {
+        "count": len(ms),
+        "mean_ms": round(statistics.mean(ms), 4),
+        "p50_ms": round(percentile(ms, 50), 4),
+        "p95_ms": round(percentile(ms, 95), 4),
+        "p99_ms": round(percentile(ms, 99), 4),
+        "max_ms": round(max(ms), 4),
+    }
+
+
+def result(benchmark: str, params: Dict[str, Any], metrics: Dict[str, Any]) -> Dict[str, Any]:
+    return {"benchmark": benchmark, "params": params, "metrics": metrics}
+
+
+def environment() -> Dict[str, Any]:
+    # Enough context to tell whether two runs are comparable
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {}
+    for name in ("numpy", "pandas", "torch", "transformers"):
+        module = sys.modules.get(name)
+        if module is not None:
+            versions[name] = getattr(module, "__version__", None)
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+        "settings": {k: v for k, v in sorted(os.environ.items()) if k.startswith("CAMPAIGNMIND_")},
+    }
+
+
+def write_results(path: str, results: List[Dict[str, Any]], config: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "schema": SCHEMA_VERSION,
+            "environment": environment(),
+            "config": config,
+            "results": results,
+        }, f, indent=2)
+
+
+def _key(entry: Dict[str, Any]) -> str:
+    return entry["benchmark"] + " " + json.dumps(entry["params"], sort_keys=True)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 20.0) -> List[Dict[str, Any]]:
+    """Changes in COMPARED_METRICS between two result files; ``regression`` marks latency
+    (``*_ms``, ``*_s``) up or throughput (``*_per_s``) down by more than ``threshold``%."""
+    before = {_key(e): e for e in baseline["results"]}
+    changes = []
+    for entry in current["results"]:
+        old = before.get(_key(entry))
+        if old is None:
+            continue
+        for metric in COMPARED_METRICS:
+            value, previous = entry["metrics"].get(metric), old["metrics"].get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(previous, (int, float)) or not previous:
+                continue
+            change = (value - previous) / previous * 100
+            if metric.endswith("_per_s"):
+                regression = change < -threshold
+            else:
+                regression = change > threshold
+            changes.append({
+                "benchmark": entry["benchmark"],
+                "params": entry["params"],
+                "metric": metric,
+                "before": previous,
+                "after": value,
+                "change_pct": round(change, 1),
+                "regression": regression,
+            })
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Percent change that counts as a regression")
+    parser.add_argument("--all", action="store_true", help="Show every metric, not only regressions")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    changes = compare(baseline, current, args.threshold)
+    shown = changes if args.all else [c for c in changes if c["regression"]]
+    for c in shown:
+        params = ", ".join(f"{k}={v}" for k, v in c["params"].items())
+        flag = "⚠️ " if c["regression"] else "   "
+        print(f"{flag}{c['benchmark']:<10}{params:<60}{c['metric']:<14}{c['before']:>12}{c['after']:>12}{c['change_pct']:>+8.1f}%")
+    regressions = sum(c["regression"] for c in changes)
+    print(f"{len(changes)} metrics compared, {regressions} regressions over {args.threshold}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
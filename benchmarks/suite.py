@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import time
+
+from benchmarks.bench_stages import run_filter_stages, run_load_stages, run_predict_stages
+from benchmarks.load_http import print_results, run_with_server
+from benchmarks.results import compare, write_results
+from benchmarks.synthetic_data import ensure_csv
+from benchmarks.tiny_model import create_tiny_model
+
+STAGES = ("load", "filter", "predict", "http")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark suite: stages and HTTP load, as JSON")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000],
+                        help="Synthetic dataset sizes (100k to 10M)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--model", choices=["tiny", "real"], default="tiny",
+                        help="tiny: random stand-in built locally, so the suite runs offline")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--filter-requests", type=int, default=2000)
+    parser.add_argument("--predict-requests", type=int, default=200)
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    parser.add_argument("--output", help="Default: benchmarks/results/<timestamp>.json")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    if args.model == "tiny" and {"predict", "http"} & set(args.stages):
+        # Set before models.inference is imported, here and in the server process
+        os.environ.update(create_tiny_model(os.path.join(args.data_dir, "tiny-model")))
+
+    results = []
+    for n_rows in args.rows:
+        print(f"📊 {n_rows} rows")
+        ensure_csv(n_rows, args.data_dir)
+        if "load" in args.stages:
+            results += run_load_stages(n_rows, args.data_dir)
+        if "filter" in args.stages:
+            results += run_filter_stages(n_rows, args.data_dir, args.repeat)
+        if "http" in args.stages:
+            http = run_with_server(
+                ensure_csv(n_rows, args.data_dir),
+                ["filter", "predict"],
+                args.concurrency,
+                {"filter": args.filter_requests, "predict": args.predict_requests},
+                {"rows": n_rows, "model": args.model},
+            )
+            print_results(http)
+            results += http
+    if "predict" in args.stages:
+        results += run_predict_stages(args.repeat, args.max_tokens)
+
+    output = args.output or os.path.join("benchmarks", "results", time.strftime("%Y%m%d-%H%M%S") + ".json")
+    write_results(output, results, vars(args))
+    print(f"✅ {len(results)} results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(output) as f:
+            current = json.load(f)
+        regressions = [c for c in compare(baseline, current) if c["regression"]]
+        for c in regressions:
+            params = ", ".join(f"{k}={v}" for k, v in c["params"].items())
+            print(f"⚠️ {c['benchmark']} {params} {c['metric']}: {c['before']} -> {c['after']} ({c['change_pct']:+.1f}%)")
+        print(f"{len(regressions)} regressions vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Category values match the Kaggle social-media-advertising dataset
+CHANNELS = ["Instagram", "Facebook", "Pinterest", "Twitter"]
+GOALS = ["Product Launch", "Increase Sales", "Market Expansion", "Brand Awareness"]
+AUDIENCES = [
+    "Men 18-24", "Women 18-24", "Men 25-34", "Women 25-34", "Men 35-44",
+    "Women 35-44", "Men 45-60", "Women 45-60", "All Ages",
+]
+SEGMENTS = ["Health", "Home", "Technology", "Food", "Fashion"]
+LOCATIONS = ["Las Vegas", "Los Angeles", "Austin", "Miami", "New York"]
+LANGUAGES = ["English", "Spanish", "French", "German", "Mandarin"]
+COMPANIES = ["Innovate Industries", "NexGen Systems", "Alpha Innovations", "DataTech Solutions", "TechCorp"]
+
+
+def generate_campaigns(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Random rows with the same schema as cleaned_campaign_data.csv."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Campaign_ID": rng.integers(100000, 999999, n_rows),
+        "Target_Audience": rng.choice(AUDIENCES, n_rows),
+        "Campaign_Goal": rng.choice(GOALS, n_rows),
+        "Duration": rng.choice([15, 30, 45, 60], n_rows),
+        "Channel_Used": rng.choice(CHANNELS, n_rows),
+        "Conversion_Rate": rng.integers(1, 16, n_rows) / 100,
+        "Acquisition_Cost": rng.uniform(500, 15000, n_rows).round(2),
+        "ROI": rng.uniform(0, 8, n_rows).round(2),
+        "Location": rng.choice(LOCATIONS, n_rows),
+        "Language": rng.choice(LANGUAGES, n_rows),
+        "Clicks": rng.integers(100, 40000, n_rows),
+        "Impressions": rng.integers(40000, 50000, n_rows),
+        "Engagement_Score": rng.integers(1, 11, n_rows),
+        "Customer_Segment": rng.choice(SEGMENTS, n_rows),
+        "Date": pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 365, n_rows), unit="D"),
+        "Company": rng.choice(COMPANIES, n_rows),
+    })
+    df["CTR"] = df["Clicks"] / df["Impressions"]
+    df["Campaign_Description"] = (
+        df["Duration"].astype(str) + "-day " + df["Channel_Used"] + " campaign for "
+        + df["Campaign_Goal"] + " targeting " + df["Target_Audience"] + " in "
+        + df["Location"] + " (" + df["Customer_Segment"] + " segment)"
+    )
+    low, high = df["ROI"].quantile([0.33, 0.66])
+    df["Success_Label"] = np.select([df["ROI"] <= low, df["ROI"] <= high], [0, 1], 2)
+    df["Month"] = df["Date"].dt.month
+    df["Quarter"] = df["Date"].dt.quarter.astype(str)
+    df["Year_Quarter"] = df["Date"].dt.to_period("Q").astype(str)
+    return df
+
+
+def write_campaigns(n_rows: int, path: str, seed: int = 42, chunk_rows: int = 1_000_000) -> None:
+    """Write ``n_rows`` synthetic rows to ``path`` one chunk at a time.
+
+    Sizes up to and beyond 10M rows never hold more than ``chunk_rows`` in memory;
+    chunk ``i > 0`` is seeded with ``(seed, i)``, so output depends only on the seed.
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    for i, start in enumerate(range(0, n_rows, chunk_rows)):
+        chunk = generate_campaigns(min(chunk_rows, n_rows - start), seed if i == 0 else [seed, i])
+        chunk.to_csv(tmp_path, index=False, mode="w" if i == 0 else "a", header=(i == 0))
+    os.rename(tmp_path, path)
+
+
+def ensure_csv(n_rows: int, directory: str, seed: int = 42) -> str:
+    """Write (or reuse) a synthetic CSV of ``n_rows`` rows and return its path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"synthetic_campaigns_{n_rows}.csv")
+    if not os.path.exists(path):
+        write_campaigns(n_rows, path, seed)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic campaign dataset")
+    parser.add_argument("--rows", type=int, default=300_000, help="100k to 10M+; written in 1M-row chunks")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmarks/data/synthetic_campaigns.csv")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    write_campaigns(args.rows, args.output, args.seed)
+    print(f"✅ Wrote {args.rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import os
+from typing import Dict
+
+from benchmarks.synthetic_data import generate_campaigns
+
+# Small enough to build in seconds on a laptop, with the same architecture, tokenizer
+# type and LoRA layout as the real FLAN-T5 + adapter, so every code path still runs
+TINY_VOCAB_SIZE = 180
+TINY_CONFIG = dict(d_model=64, d_kv=32, d_ff=128, num_layers=2, num_decoder_layers=2, num_heads=2)
+
+
+def create_tiny_model(directory: str, seed: int = 0) -> Dict[str, str]:
+    """Build a randomly initialized T5, its tokenizer and a LoRA adapter in ``directory``.
+
+    Returns the environment variables that point the backend at them. Predictions
+    are meaningless but cost the same code paths, so benchmarks run offline.
+    """
+    import sentencepiece as spm
+    import torch
+    from peft import LoraConfig, TaskType, get_peft_model
+    from transformers import T5Config, T5ForConditionalGeneration, T5Tokenizer
+
+    from models.generate_finetune_jsonl import build_completions
+
+    base_dir = os.path.join(directory, "base")
+    adapter_dir = os.path.join(directory, "adapter")
+    os.makedirs(base_dir, exist_ok=True)
+
+    # Tokenizer trained on the same kind of text the real model sees and emits
+    df = generate_campaigns(2000, seed)
+    corpus = df["Campaign_Description"].tolist() + build_completions(df).tolist()
+    spm.SentencePieceTrainer.train(
+        sentence_iterator=iter(corpus),
+        model_prefix=os.path.join(base_dir, "spiece"),
+        vocab_size=TINY_VOCAB_SIZE,
+        hard_vocab_limit=False,
+        pad_id=0, eos_id=1, unk_id=2, bos_id=-1,
+        minloglevel=2,
+    )
+    tokenizer = T5Tokenizer(os.path.join(base_dir, "spiece.model"), extra_ids=0)
+    tokenizer.save_pretrained(base_dir)
+
+    torch.manual_seed(seed)
+    config = T5Config(vocab_size=len(tokenizer), decoder_start_token_id=0, pad_token_id=0, eos_token_id=1, **TINY_CONFIG)
+    T5ForConditionalGeneration(config).save_pretrained(base_dir)
+
+    # Reloaded so the adapter records where its base model lives
+    base = T5ForConditionalGeneration.from_pretrained(base_dir)
+    lora_config = LoraConfig(r=4, lora_alpha=8, target_modules=["q", "v"], task_type=TaskType.SEQ_2_SEQ_LM)
+    get_peft_model(base, lora_config).save_pretrained(adapter_dir)
+
+    return {
+        "CAMPAIGNMIND_BASE_MODEL": os.path.abspath(base_dir),
+        "CAMPAIGNMIND_ADAPTER_DIR": os.path.abspath(adapter_dir),
+        "CAMPAIGNMIND_MERGED_MODEL_DIR": os.path.abspath(os.path.join(directory, "merged")),
+        "CAMPAIGNMIND_ONNX_MODEL_DIR": os.path.abspath(os.path.join(directory, "onnx")),
+        "CAMPAIGNMIND_PREDICTION_CACHE_PATH": os.path.abspath(os.path.join(directory, "prediction_cache.sqlite3")),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create a tiny offline stand-in for the fine-tuned model")
+    parser.add_argument("--output", default="benchmarks/data/tiny-model")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    env = create_tiny_model(args.output, args.seed)
+    print(f"✅ Tiny model written to {args.output}; point the backend at it with:")
+    for key, value in env.items():
+        print(f"export {key}={value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,15 @@
+import json
 import streamlit as st
 import requests
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 
 # FastAPI endpoints
 FILTER_API_URL = "http://localhost:8000/filter-campaigns"
-PREDICT_API_URL = "http://localhost:8000/predict-campaign-outcome"
+PREDICT_STREAM_API_URL = "http://localhost:8000/predict-campaign-outcome/stream"
+SIMILAR_API_URL = "http://localhost:8000/similar-campaigns"
 
 st.set_page_config(page_title="Campaign Analyzer", layout="wide")
 
@@ -62,11 +65,24 @@ elif page == "📊 Campaign Explorer":
                 "segment": segment if segment else None,
                 "quarter": quarter if quarter else None,
                 "location": location if location else None,
+                # Only the breakdowns plotted as violins below
+                "distributions": ["engagement_by_audience", "engagement_by_location"],
             }
 
             try:
-                response = requests.post(FILTER_API_URL, json=payload)
-                result = response.json()
+                # Revalidate with the last ETag for these filters; 304 means reuse the stored result
+                filter_cache = st.session_state.setdefault("filter_cache", {})
+                cache_key = json.dumps(payload, sort_keys=True)
+                cached = filter_cache.get(cache_key)
+                headers = {"If-None-Match": cached["etag"]} if cached else {}
+
+                response = requests.post(FILTER_API_URL, json=payload, headers=headers)
+                if response.status_code == 304 and cached:
+                    result = cached["result"]
+                else:
+                    result = response.json()
+                    if response.headers.get("ETag"):
+                        filter_cache[cache_key] = {"etag": response.headers["ETag"], "result": result}
 
                 if result["message"] == "Success":
                     st.subheader("📈 Summary KPIs")
@@ -83,6 +99,14 @@ elif page == "📊 Campaign Explorer":
                             fig = chart_fn(df, **kwargs)
                             st.plotly_chart(fig, use_container_width=True)
 
+                    def distribution_points(summary, edges, n=200):
+                        # Stand-in values that follow a group's histogram, for violin plots
+                        edges = np.array(edges)
+                        cdf = np.cumsum(summary["histogram"]) / summary["count"]
+                        bins = np.searchsorted(cdf, (np.arange(n) + 0.5) / n)
+                        centers = (edges[:-1] + edges[1:]) / 2
+                        return np.clip(centers[bins], summary["min"], summary["max"])
+
                     st.subheader("📊 KPI Visualizations")
 
                     if multi_view:
@@ -98,11 +122,18 @@ elif page == "📊 Campaign Explorer":
                         })
                         safe_plot(conversion_df, px.pie, names="Platform", values="Conversion Rate", title="Conversion Rate by Platform")
 
-                        engagement_df = pd.DataFrame({
-                            "Audience": list(result["engagement_by_audience"].keys()),
-                            "Engagement Score": list(result["engagement_by_audience"].values())
-                        })
-                        safe_plot(engagement_df, px.box, y="Engagement Score", x="Audience", title="Engagement Score by Audience")
+                        # Box plots straight from the per-group percentiles the API returns
+                        engagement_groups = result["distributions"]["engagement_by_audience"].get("groups", {})
+                        if engagement_groups:
+                            box_fig = go.Figure()
+                            for audience, summary in engagement_groups.items():
+                                box_fig.add_trace(go.Box(
+                                    name=audience, x=[audience],
+                                    lowerfence=[summary["min"]], q1=[summary["p25"]], median=[summary["p50"]],
+                                    q3=[summary["p75"]], upperfence=[summary["max"]]
+                                ))
+                            box_fig.update_layout(title="Engagement Score by Audience", xaxis_title="Audience", yaxis_title="Engagement Score")
+                            st.plotly_chart(box_fig, use_container_width=True)
 
                         ctr_df = pd.DataFrame({
                             "Quarter": list(result["ctr_by_quarter"].keys()),
@@ -124,10 +155,12 @@ elif page == "📊 Campaign Explorer":
                         })
                         safe_plot(conv_loc_df, px.pie, names="Location", values="Conversion Rate", title="Conversion Rate by Location")
 
-                        eng_loc_df = pd.DataFrame({
-                            "Location": list(result["engagement_by_location"].keys()),
-                            "Engagement Score": list(result["engagement_by_location"].values())
-                        })
+                        eng_loc = result["distributions"]["engagement_by_location"]
+                        eng_loc_df = pd.DataFrame([
+                            {"Location": location, "Engagement Score": value}
+                            for location, summary in eng_loc.get("groups", {}).items()
+                            for value in distribution_points(summary, eng_loc["edges"])
+                        ])
                         safe_plot(eng_loc_df, px.violin, x="Location", y="Engagement Score", color="Location", box=True, title="Engagement Score by Location")
 
                         ctr_loc_df = pd.DataFrame({
@@ -186,21 +219,62 @@ elif page == "🧠 Campaign Outcome Predictor":
         if input_text.strip() == "":
             st.warning("Please enter a campaign description.")
         else:
-            with st.spinner("Generating prediction..."):
-                try:
-                    res = requests.post(PREDICT_API_URL, json={"description": input_text})
-                    res.raise_for_status()
-                    prediction = res.json()["prediction"]
-
-                    st.success("✅ Prediction")
-                    with st.container():
-                        st.markdown(
-                            f"""
-                            <div style='padding: 12px 18px; background-color: #111827; color: #f1f5f9; border-radius: 8px; font-family: monospace; font-size: 16px; white-space: pre-wrap; word-wrap: break-word;'>
-                            {prediction}
-                            </div>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                except Exception as e:
-                    st.error(f"Error: {e}")
+            # Filled in once the prediction is complete, or with the error
+            status = st.empty()
+            placeholder = st.empty()
+
+            def render_prediction(text):
+                placeholder.markdown(
+                    f"""
+                    <div style='padding: 12px 18px; background-color: #111827; color: #f1f5f9; border-radius: 8px; font-family: monospace; font-size: 16px; white-space: pre-wrap; word-wrap: break-word;'>
+                    {text}
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+
+            try:
+                # Server-Sent Events: render each token as the model produces it
+                partial = ""
+                prediction = None
+                event = None
+                with requests.post(PREDICT_STREAM_API_URL, json={"description": input_text}, stream=True) as res:
+                    if not res.ok:
+                        # 503 while the model loads or the queue is full, with the reason in "detail"
+                        try:
+                            detail = res.json()["detail"]
+                        except (ValueError, KeyError):
+                            detail = f"{res.status_code} {res.reason}"
+                        raise RuntimeError(detail)
+                    for line in res.iter_lines(decode_unicode=True):
+                        if line.startswith("event:"):
+                            event = line[len("event:"):].strip()
+                        elif line.startswith("data:"):
+                            data = json.loads(line[len("data:"):])
+                            if event == "token":
+                                partial += data["text"]
+                                render_prediction(partial + " ▌")
+                            elif event == "done":
+                                prediction = data["prediction"]
+                            elif event == "error":
+                                raise RuntimeError(data["detail"])
+                if prediction is None:
+                    raise RuntimeError("the prediction stream ended early")
+                render_prediction(prediction)
+                status.success("✅ Prediction")
+            except Exception as e:
+                status.error(f"Error: {e}")
+
+            try:
+                # What the closest past campaigns actually achieved, to weigh the prediction against
+                similar = requests.post(SIMILAR_API_URL, json={"description": input_text, "k": 10}).json()
+                if similar["similar_campaigns"]:
+                    st.subheader("📚 Similar Past Campaigns")
+                    k1, k2, k3, k4 = st.columns(4)
+                    k1.metric("Avg ROI", similar["average_roi"])
+                    k2.metric("Avg Conversion Rate", similar["average_conversion_rate"])
+                    k3.metric("Avg Engagement Score", similar["average_engagement_score"])
+                    k4.metric("Avg CTR", similar["average_ctr"])
+                    st.dataframe(pd.DataFrame(similar["similar_campaigns"]), use_container_width=True, hide_index=True)
+            except Exception as e:
+                st.error(f"Error: {e}")
@@ -0,0 +1,103 @@
+import argparse
+import csv
+import json
+import os
+import time
+from multiprocessing import Pool
+from typing import List, Tuple
+
+from models.parsing import parse_prediction
+
+OUTPUT_FIELDS = [
+    "index", "description", "predicted_roi", "predicted_conversion_rate",
+    "success_probability", "recommendation", "prediction",
+]
+
+
+def read_descriptions(path: str, column: str) -> List[str]:
+    # CSV: the given column; JSONL: a "description" field or the user turn of a chat record
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            return [row[column] for row in csv.DictReader(f)]
+
+    descriptions = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "messages" in record:
+                record = {"description": next(m["content"] for m in record["messages"] if m["role"] == "user")}
+            descriptions.append(record.get("description") or record[column])
+    return descriptions
+
+
+def length_sorted_batches(descriptions: List[str], batch_size: int) -> List[List[Tuple[int, str]]]:
+    # Similar lengths share a batch, so little compute is spent on padding
+    order = sorted(range(len(descriptions)), key=lambda i: len(descriptions[i]))
+    return [
+        [(i, descriptions[i]) for i in order[start:start + batch_size]]
+        for start in range(0, len(order), batch_size)
+    ]
+
+
+def init_worker(threads: int) -> None:
+    # Each process loads its own model copy; split the cores instead of oversubscribing
+    from models.inference import load_model
+    load_model(threads=threads)
+
+
+def score_batch(args) -> List[Tuple[int, str]]:
+    batch, max_tokens = args
+    from models.inference import generate_campaign_predictions
+    predictions = generate_campaign_predictions([d for _, d in batch], max_tokens)
+    return [(i, p) for (i, _), p in zip(batch, predictions)]
+
+
+def write_results(path: str, rows: List[dict]) -> None:
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score campaign descriptions offline with the fine-tuned model")
+    parser.add_argument("input", help="CSV or JSONL file of campaign descriptions")
+    parser.add_argument("output", help="Output file (.csv or .jsonl)")
+    parser.add_argument("--column", default="Campaign_Description", help="Description column/field name")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    args = parser.parse_args()
+
+    descriptions = read_descriptions(args.input, args.column)
+    batches = length_sorted_batches(descriptions, args.batch_size)
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    print(f"🔍 Scoring {len(descriptions)} descriptions in {len(batches)} batches with {args.workers} workers...")
+
+    start = time.time()
+    predictions = [None] * len(descriptions)
+    with Pool(args.workers, initializer=init_worker, initargs=(threads,)) as pool:
+        tasks = [(batch, args.max_tokens) for batch in batches]
+        for done, results in enumerate(pool.imap_unordered(score_batch, tasks), start=1):
+            for i, prediction in results:
+                predictions[i] = prediction
+            print(f"  {done}/{len(batches)} batches", end="\r")
+
+    rows = [
+        {"index": i, "description": d, **parse_prediction(p), "prediction": p}
+        for i, (d, p) in enumerate(zip(descriptions, predictions))
+    ]
+    write_results(args.output, rows)
+    elapsed = time.time() - start
+    print(f"\n✅ Wrote {len(rows)} predictions to {args.output} ({len(rows) / elapsed:.1f} descriptions/s)")
+
+
+if __name__ == "__main__":
+    main()
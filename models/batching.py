@@ -0,0 +1,205 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from telemetry.metrics import BATCH_SIZE, QUEUE_WAIT_SECONDS
+
+# Scheduler limits (override with environment variables)
+MAX_BATCH_SIZE = int(os.getenv("CAMPAIGNMIND_MAX_BATCH_SIZE", "8"))
+MAX_BATCH_WAIT_MS = float(os.getenv("CAMPAIGNMIND_MAX_BATCH_WAIT_MS", "10"))
+
+# generate() calls allowed at once, and predictions admitted (queued or running)
+# before new ones are turned away
+INFERENCE_WORKERS = int(os.getenv("CAMPAIGNMIND_INFERENCE_WORKERS", "1"))
+MAX_PENDING_PREDICTIONS = int(os.getenv("CAMPAIGNMIND_MAX_PENDING_PREDICTIONS", "64"))
+
+# Seconds a prediction may wait and run before it is abandoned
+PREDICTION_TIMEOUT_SECONDS = float(os.getenv("CAMPAIGNMIND_PREDICTION_TIMEOUT", "30"))
+
+
+class Overloaded(Exception):
+    """Raised when the pending-prediction limit is reached."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Set on a prediction whose deadline passed before it could be generated."""
+
+
+@dataclass
+class PendingPrediction:
+    description: str
+    max_tokens: int
+    deadline: Optional[float] = None
+    future: Future = field(default_factory=Future)
+    enqueued: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    """Collects concurrent prediction requests into padded generate() batches.
+
+    A batch is flushed when it reaches ``max_batch_size`` or when the oldest
+    request has waited ``max_wait_ms``. Requests with a different
+    ``max_tokens`` than the batch head are carried over to the next batch.
+
+    It is also the inference executor: at most ``workers`` generate() calls
+    run at once (streaming generations take the same ``slots``), at most
+    ``max_pending`` predictions are admitted, and requests whose deadline
+    passes while queued are dropped before they reach the model.
+    """
+
+    def __init__(
+        self,
+        generate_batch: Callable[[List[str], int], List[str]],
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_BATCH_WAIT_MS,
+        workers: int = INFERENCE_WORKERS,
+        max_pending: int = MAX_PENDING_PREDICTIONS,
+    ):
+        self.generate_batch = generate_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.workers = workers
+        self.max_pending = max_pending
+        self.slots = threading.BoundedSemaphore(workers)
+        self._queue: "queue.Queue[Optional[PendingPrediction]]" = queue.Queue()
+        self._carry: deque = deque()
+        self._collect_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def start(self) -> None:
+        if any(t.is_alive() for t in self._threads):
+            return
+        self._threads = [
+            threading.Thread(target=self._run, name=f"prediction-batcher-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self) -> None:
+        if self._threads:
+            self._queue.put(None)
+            for t in self._threads:
+                t.join()
+            self._threads = []
+            # Each worker re-queued the sentinel on its way out; take the last copy back
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+
+    def admit(self) -> None:
+        """Reserve room for one prediction; pair with ``release()``."""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise Overloaded(f"{self.pending} predictions already pending")
+            self.pending += 1
+
+    def release(self, *_) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def overloaded(self) -> bool:
+        return self.pending >= self.max_pending
+
+    def submit(self, description: str, max_tokens: int = 128, timeout: Optional[float] = None) -> Future:
+        if not self._threads:
+            self.start()
+        self.admit()
+        deadline = time.perf_counter() + timeout if timeout is not None else None
+        pending = PendingPrediction(description, max_tokens, deadline)
+        pending.future.add_done_callback(self.release)
+        self._queue.put(pending)
+        return pending.future
+
+    def predict(self, description: str, max_tokens: int = 128) -> str:
+        return self.submit(description, max_tokens).result()
+
+    def _collect(self) -> Optional[List[PendingPrediction]]:
+        # One worker assembles a batch at a time; the others wait for the next one
+        with self._collect_lock:
+            return self._collect_batch()
+
+    def _collect_batch(self) -> Optional[List[PendingPrediction]]:
+        head = self._carry.popleft() if self._carry else self._queue.get()
+        if head is None:
+            self._queue.put(None)
+            return None
+
+        batch, skipped = [head], []
+        deadline = head.enqueued + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if self._carry:
+                    item = self._carry.popleft()
+                elif remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    # Past the deadline: still take whatever is already queued
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Shutdown requested: serve this batch, then exit on the next collect
+                # (the sentinel goes back so every worker sees it)
+                self._queue.put(None)
+                break
+            if item.max_tokens == head.max_tokens:
+                batch.append(item)
+            else:
+                skipped.append(item)
+
+        self._carry.extend(skipped)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            # Drop requests whose caller already gave up or whose deadline has passed
+            now = time.perf_counter()
+            batch = [p for p in batch if p.future.set_running_or_notify_cancel()]
+            for p in [p for p in batch if p.deadline is not None and p.deadline <= now]:
+                p.future.set_exception(DeadlineExceeded("Prediction deadline passed while queued"))
+                with self._lock:
+                    self.expired += 1
+            batch = [p for p in batch if not p.future.done()]
+            if not batch:
+                continue
+            try:
+                with self.slots:
+                    # Queue wait: from submit() until generate() can start
+                    started = time.perf_counter()
+                    for p in batch:
+                        QUEUE_WAIT_SECONDS.observe(started - p.enqueued)
+                    BATCH_SIZE.observe(len(batch))
+                    results = self.generate_batch([p.description for p in batch], batch[0].max_tokens)
+            except Exception as e:
+                for p in batch:
+                    p.future.set_exception(e)
+                continue
+            for p, result in zip(batch, results):
+                p.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "queued": self._queue.qsize() + len(self._carry),
+            "rejected": self.rejected,
+            "expired": self.expired,
+        }
@@ -1,14 +1,17 @@
-import json
 import os
 
-INPUT_FILE = os.path.join(os.path.dirname(__file__), "../models/campaign_finetune_data.jsonl")
+from models.generate_finetune_jsonl import INPUT_CSV, build_dataset
+
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "../models/campaign_finetune_data_50k.jsonl")
 MAX_RECORDS = 50000
 
-with open(INPUT_FILE, "r") as infile, open(OUTPUT_FILE, "w") as outfile:
-    for i, line in enumerate(infile):
-        if i >= MAX_RECORDS:
-            break
-        outfile.write(line)
+def main():
+    # Sampled straight from the CSV, balanced across Success_Label x Channel_Used,
+    # instead of keeping the first 50k lines of the full JSONL
+    workers = max(1, (os.cpu_count() or 2) - 1)
+    result = build_dataset(INPUT_CSV, OUTPUT_FILE, workers=workers, sample=MAX_RECORDS)
+    print(f"✅ Created {OUTPUT_FILE} with {result['records']} records.")
 
-print(f"✅ Created {OUTPUT_FILE} with {MAX_RECORDS} records.")
+# Guarded so worker processes started with "spawn" (macOS) don't rerun the build
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,256 @@
-import pandas as pd
+import argparse
 import json
 import os
+from collections import deque
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
 
 INPUT_CSV = os.path.join(os.path.dirname(__file__), "../backend/data/cleaned_campaign_data.csv")
 OUTPUT_JSONL = os.path.join(os.path.dirname(__file__), "../models/campaign_finetune_data.jsonl")
 
+REQUIRED_COLUMNS = [
+    "Campaign_Description", "ROI", "Conversion_Rate", "Success_Label",
+    "Target_Audience", "Location", "Channel_Used", "Engagement_Score"
+]
+
+# Rows per chunk read from the CSV and formatted by one worker
+CHUNK_ROWS = 50000
+
+# Sampling strata: every (Success_Label, Channel_Used) pair gets an equal quota
+STRATA_COLUMNS = ["Success_Label", "Channel_Used"]
+
+SYSTEM_PROMPT = "You are an AI campaign performance predictor."
+
+# json.dumps() of the chat record, split around the prompt and completion strings
+RECORD_PREFIX = '{"messages": [{"role": "system", "content": ' + json.dumps(SYSTEM_PROMPT) + '}, {"role": "user", "content": '
+RECORD_MIDDLE = '}, {"role": "assistant", "content": '
+RECORD_SUFFIX = "}]}\n"
+
+SUCCESS_LABELS = {0: "Low", 1: "Medium", 2: "High"}
+
 def map_success_label(label: int) -> str:
-    return {
-        0: "Low",
-        1: "Medium",
-        2: "High"
-    }.get(label, "Unknown")
-
-def build_completion(row: pd.Series) -> str:
-    recommendation = (
-        f"Recommendation: In past campaigns targeting {row['Target_Audience']} in {row['Location']}, "
-        f"{row['Channel_Used']} showed {'higher' if row['Engagement_Score'] >= 5 else 'lower'} engagement. "
-        f"Consider evaluating Instagram or Pinterest for improved reach."
-    )
+    return SUCCESS_LABELS.get(label, "Unknown")
+
+def format_rounded(values: pd.Series, decimals: int) -> pd.Series:
+    # Same text as str(round(x, decimals)): correctly rounded, trailing zeros dropped
+    if pd.api.types.is_integer_dtype(values):
+        return values.astype(str)
+    text = values.map(f"{{:.{decimals}f}}".format).str.rstrip("0")
+    return text.where(~text.str.endswith("."), text + "0")
+
+def build_completions(chunk: pd.DataFrame) -> pd.Series:
+    """The assistant turn for every row of ``chunk``: predicted KPIs and a recommendation."""
+    engagement = np.where(chunk["Engagement_Score"] >= 5, "higher", "lower")
+    labels = chunk["Success_Label"].map(SUCCESS_LABELS).fillna("Unknown")
     return (
-        f"Predicted ROI: {round(row['ROI'], 2)}\n"
-        f"Predicted Conversion Rate: {round(row['Conversion_Rate'], 4)}\n"
-        f"Success Probability: {map_success_label(row['Success_Label'])}\n"
-        f"{recommendation}"
+        "Predicted ROI: " + format_rounded(chunk["ROI"], 2) + "\n"
+        + "Predicted Conversion Rate: " + format_rounded(chunk["Conversion_Rate"], 4) + "\n"
+        + "Success Probability: " + labels + "\n"
+        + "Recommendation: In past campaigns targeting " + chunk["Target_Audience"].astype(str)
+        + " in " + chunk["Location"].astype(str) + ", "
+        + chunk["Channel_Used"].astype(str) + " showed " + engagement + " engagement. "
+        + "Consider evaluating Instagram or Pinterest for improved reach."
     )
 
-def main():
-    if not os.path.exists(INPUT_CSV):
-        raise FileNotFoundError(f"CSV not found at: {INPUT_CSV}")
+def build_records(chunk: pd.DataFrame) -> np.ndarray:
+    """One JSONL line per row, identical to json.dumps() of the chat record."""
+    prompts = chunk["Campaign_Description"].str.strip().map(json.dumps)
+    completions = build_completions(chunk).map(json.dumps)
+    return (RECORD_PREFIX + prompts + RECORD_MIDDLE + completions + RECORD_SUFFIX).to_numpy()
+
+def format_chunk(args) -> Tuple[int, np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    # Runs in a worker: returns the chunk's first row number, its lines and, when
+    # sampling, each row's stratum and sampling hash
+    start, chunk, seed = args
+    lines = build_records(chunk)
+    if seed is None:
+        return start, lines, None, None
+
+    label, channel = STRATA_COLUMNS
+    strata = (chunk[label].astype(str) + "|" + chunk[channel].astype(str)).to_numpy()
+    # Hashing the row number too keeps duplicate descriptions from sharing a rank
+    keys = pd.DataFrame({
+        "description": chunk["Campaign_Description"].to_numpy(),
+        "row": np.arange(start, start + len(chunk)),
+    })
+    hashes = pd.util.hash_pandas_object(keys, index=False, hash_key=f"{seed:016d}"[-16:]).to_numpy()
+    return start, lines, strata, hashes
+
+class StratifiedSample:
+    """Deterministic equal-allocation sample of at most ``size`` rows in one pass.
+
+    Each stratum keeps the rows with the smallest hashes (bottom-k). Every
+    stratum gets ``size // strata`` rows and the remainder goes one row each to
+    the strata with the most input rows, so the sample has exactly ``size``
+    rows unless some stratum runs short. While reading, each stratum keeps up
+    to the rounded-up quota, which only shrinks as new strata appear, so
+    trimming never drops a row the final sample would contain.
+    """
 
-    df = pd.read_csv(INPUT_CSV)
-    required_cols = [
-        "Campaign_Description", "ROI", "Conversion_Rate", "Success_Label",
-        "Target_Audience", "Location", "Channel_Used", "Engagement_Score"
-    ]
+    def __init__(self, size: int):
+        self.size = size
+        self.kept: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self.seen: Dict[str, int] = {}
 
-    for col in required_cols:
-        if col not in df.columns:
+    @property
+    def quota(self) -> int:
+        return max(1, -(-self.size // max(1, len(self.kept))))
+
+    def quotas(self) -> Dict[str, int]:
+        # Final allocation; ties for the remainder go to the stratum that sorts first
+        strata = sorted(self.kept, key=lambda stratum: (-self.seen[stratum], stratum))
+        base, extra = divmod(self.size, max(1, len(strata)))
+        return {stratum: base + (i < extra) for i, stratum in enumerate(strata)}
+
+    def add(self, start: int, lines: np.ndarray, strata: np.ndarray, hashes: np.ndarray) -> None:
+        rows = np.arange(start, start + len(lines))
+        for stratum in np.unique(strata):
+            mask = strata == stratum
+            self.seen[stratum] = self.seen.get(stratum, 0) + int(mask.sum())
+            if stratum in self.kept:
+                kept_hashes, kept_rows, kept_lines = self.kept[stratum]
+                self.kept[stratum] = (
+                    np.concatenate([kept_hashes, hashes[mask]]),
+                    np.concatenate([kept_rows, rows[mask]]),
+                    np.concatenate([kept_lines, lines[mask]]),
+                )
+            else:
+                self.kept[stratum] = (hashes[mask], rows[mask], lines[mask])
+        quota = self.quota
+        for stratum, (kept_hashes, kept_rows, kept_lines) in self.kept.items():
+            if len(kept_hashes) > quota:
+                # Ties broken by row number so the result doesn't depend on chunking
+                keep = np.lexsort((kept_rows, kept_hashes))[:quota]
+                self.kept[stratum] = (kept_hashes[keep], kept_rows[keep], kept_lines[keep])
+
+    def sample(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        # Rows and lines of each stratum, cut to its final quota
+        sample = {}
+        for stratum, quota in self.quotas().items():
+            kept_hashes, kept_rows, kept_lines = self.kept[stratum]
+            keep = np.lexsort((kept_rows, kept_hashes))[:quota]
+            sample[stratum] = (kept_rows[keep], kept_lines[keep])
+        return sample
+
+    def lines(self) -> np.ndarray:
+        # Sampled rows in their original file order
+        if not self.kept:
+            return np.array([], dtype=object)
+        sample = self.sample().values()
+        rows = np.concatenate([r for r, _ in sample])
+        lines = np.concatenate([l for _, l in sample])
+        return lines[np.argsort(rows, kind="stable")]
+
+    def counts(self) -> Dict[str, int]:
+        return {stratum: len(rows) for stratum, (rows, _) in sorted(self.sample().items())}
+
+def shard_paths(output: str, shards: int) -> List[str]:
+    if shards == 1:
+        return [output]
+    base, ext = os.path.splitext(output)
+    return [f"{base}-{i:05d}-of-{shards:05d}{ext}" for i in range(shards)]
+
+def write_lines(files, first_record: int, lines: np.ndarray) -> None:
+    # Record i goes to shard i % shards
+    shards = len(files)
+    for i, f in enumerate(files):
+        offset = (i - first_record) % shards
+        f.write("".join(lines[offset::shards]))
+
+def read_chunks(path: str, chunk_rows: int, seed: Optional[int]):
+    start = 0
+    for chunk in pd.read_csv(path, usecols=REQUIRED_COLUMNS, chunksize=chunk_rows):
+        yield start, chunk, seed
+        start += len(chunk)
+
+def ordered_results(tasks, workers: int):
+    # Chunks are formatted in parallel but yielded in file order; at most two chunks
+    # per worker are in flight, so memory stays flat however large the CSV is
+    if workers <= 1:
+        yield from map(format_chunk, tasks)
+        return
+    with Pool(workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.apply_async(format_chunk, (task,)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+def build_dataset(
+    input_csv: str = INPUT_CSV,
+    output: str = OUTPUT_JSONL,
+    shards: int = 1,
+    workers: int = 1,
+    sample: Optional[int] = None,
+    seed: int = 42,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Dict[str, object]:
+    """Stream ``input_csv`` into chat-format JSONL, optionally as a stratified sample."""
+    if not os.path.exists(input_csv):
+        raise FileNotFoundError(f"CSV not found at: {input_csv}")
+
+    header = pd.read_csv(input_csv, nrows=0).columns
+    for col in REQUIRED_COLUMNS:
+        if col not in header:
             raise ValueError(f"Missing column in dataset: {col}")
 
-    with open(OUTPUT_JSONL, "w") as f_out:
-        for _, row in df.iterrows():
-            prompt = row["Campaign_Description"].strip()
-            completion = build_completion(row)
-
-            record = {
-                "messages": [
-                    {"role": "system", "content": "You are an AI campaign performance predictor."},
-                    {"role": "user", "content": prompt},
-                    {"role": "assistant", "content": completion}
-                ]
-            }
-            f_out.write(json.dumps(record) + "\n")
-
-    print(f"✅ JSONL file created: {OUTPUT_JSONL}")
+    tasks = read_chunks(input_csv, chunk_rows, seed if sample else None)
+    paths = shard_paths(output, shards)
+    sampler = StratifiedSample(sample) if sample else None
+    rows = written = 0
+
+    files = [open(path, "w") for path in paths]
+    try:
+        for start, lines, strata, hashes in ordered_results(tasks, workers):
+            rows += len(lines)
+            if sampler is None:
+                write_lines(files, start, lines)
+                written += len(lines)
+            else:
+                sampler.add(start, lines, strata, hashes)
+        if sampler is not None:
+            lines = sampler.lines()
+            write_lines(files, 0, lines)
+            written = len(lines)
+    finally:
+        for f in files:
+            f.close()
+
+    return {
+        "rows": rows,
+        "records": written,
+        "paths": paths,
+        "strata": sampler.counts() if sampler is not None else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the chat-format fine-tuning JSONL from the campaign CSV")
+    parser.add_argument("--input", default=INPUT_CSV)
+    parser.add_argument("--output", default=OUTPUT_JSONL)
+    parser.add_argument("--shards", type=int, default=1, help="Split the records across this many JSONL files")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--sample", type=int, help="Keep at most this many records, split equally across "
+                                                    "Success_Label x Channel_Used strata")
+    parser.add_argument("--seed", type=int, default=42, help="Sampling seed; same seed and input, same sample")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    result = build_dataset(
+        args.input, args.output, args.shards, args.workers, args.sample, args.seed, args.chunk_rows
+    )
+    if result["strata"] is not None:
+        for stratum, count in result["strata"].items():
+            print(f"  {stratum}: {count}")
+        if result["records"] < args.sample:
+            print(f"⚠️ Only {result['records']} of {args.sample} requested records: some strata have too few rows")
+    for path in result["paths"]:
+        print(f"✅ JSONL file created: {path}")
+    print(f"{result['records']} records from {result['rows']} rows")
 
 if __name__ == "__main__":
     main()
@@ -1,21 +1,359 @@
+import argparse
+import asyncio
+import os
+import shutil
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+import torch
 from peft import PeftModel
-from transformers import T5Tokenizer, T5ForConditionalGeneration
+from transformers import (
+    AsyncTextIteratorStreamer,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    T5ForConditionalGeneration,
+    T5Tokenizer,
+)
+from models.batching import INFERENCE_WORKERS, DeadlineExceeded
+from models.prediction_cache import model_identity
+from telemetry.metrics import QUEUE_WAIT_SECONDS, TOKENS_GENERATED, stage
 
-# ✅ Point to your saved LoRA model directory
-MODEL_DIR = "models/flan-t5-lora-campaignmind-300k"
+# ✅ Point to your saved LoRA model directory (both can be overridden, e.g. with the
+# offline stand-in from `python -m benchmarks.tiny_model`)
+MODEL_DIR = os.getenv("CAMPAIGNMIND_ADAPTER_DIR", "models/flan-t5-lora-campaignmind-300k")
+BASE_MODEL = os.getenv("CAMPAIGNMIND_BASE_MODEL", "google/flan-t5-small")
 
-# Load base model
-base_model = T5ForConditionalGeneration.from_pretrained("google/flan-t5-small")
-tokenizer = T5Tokenizer.from_pretrained("google/flan-t5-small")
+# Base + LoRA merged once and saved here, so later startups skip the merge
+MERGED_MODEL_DIR = os.getenv("CAMPAIGNMIND_MERGED_MODEL_DIR", "models/flan-t5-campaignmind-merged")
+IDENTITY_FILE = "campaignmind_identity.txt"
 
-# Load LoRA adapter and merge it with the base model
-model = PeftModel.from_pretrained(base_model, MODEL_DIR)
-model = model.merge_and_unload()  # ✅ Enables .generate()
-model.eval()
+# "torch": fp32 PyTorch; "int8": dynamically quantized Linear layers; "onnx": ONNX
+# Runtime graph exported from the merged checkpoint (needs optimum[onnxruntime])
+INFERENCE_BACKENDS = ("torch", "int8", "onnx")
+INFERENCE_BACKEND = os.getenv("CAMPAIGNMIND_INFERENCE_BACKEND", "torch")
+ONNX_MODEL_DIR = os.getenv("CAMPAIGNMIND_ONNX_MODEL_DIR", "models/flan-t5-campaignmind-onnx")
+
+# Intra-op threads per generate() call; by default the cores minus one (left for the
+# event loop and analytics queries) are split across the inference workers
+TORCH_THREADS = int(os.getenv(
+    "CAMPAIGNMIND_TORCH_THREADS",
+    str(max(1, ((os.cpu_count() or 1) - 1) // max(1, INFERENCE_WORKERS))),
+))
+TORCH_INTEROP_THREADS = int(os.getenv("CAMPAIGNMIND_TORCH_INTEROP_THREADS", "1"))
+
+# Most tokens a caller may ask for per prediction; T5 was trained on 512-token sequences
+MAX_PREDICTION_TOKENS = int(os.getenv("CAMPAIGNMIND_MAX_PREDICTION_TOKENS", "512"))
+
+WARMUP_DESCRIPTION = "A 15-day Facebook campaign for a product launch targeting Women 45-60 in Austin."
+
+# Populated by load_model(); read through get_model()
+model = None
+tokenizer = None
+
+_load_lock = threading.Lock()
+_loader: Optional[threading.Thread] = None
+_status: Dict[str, Any] = {
+    "state": "not_loaded",  # not_loaded -> loading -> ready | failed
+    "backend": INFERENCE_BACKEND,
+    "torch_threads": None,
+    "source": None,
+    "load_seconds": None,
+    "warmup_seconds": None,
+    "error": None,
+}
+
+
+def _is_current(directory: str, identity: str) -> bool:
+    path = os.path.join(directory, IDENTITY_FILE)
+    if not os.path.isfile(path):
+        return False
+    with open(path) as f:
+        return f.read().strip() == identity
+
+
+def merge_adapter():
+    # Load base model, then load LoRA adapter and merge it with the base model
+    base_model = T5ForConditionalGeneration.from_pretrained(BASE_MODEL)
+    merged = PeftModel.from_pretrained(base_model, MODEL_DIR)
+    merged = merged.merge_and_unload()  # ✅ Enables .generate()
+    return merged, T5Tokenizer.from_pretrained(BASE_MODEL)
+
+
+def _save_with_identity(saved, saved_tokenizer, output_dir: str) -> str:
+    # Written next to the final directory and renamed into place
+    tmp_dir = f"{output_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    saved.save_pretrained(tmp_dir)
+    saved_tokenizer.save_pretrained(tmp_dir)
+    with open(os.path.join(tmp_dir, IDENTITY_FILE), "w") as f:
+        f.write(model_identity(MODEL_DIR, BASE_MODEL))
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.rename(tmp_dir, output_dir)
+    return output_dir
+
+
+def export_merged_model(merged=None, merged_tokenizer=None, output_dir: str = MERGED_MODEL_DIR) -> str:
+    """Save the merged weights plus the adapter identity they were built from."""
+    if merged is None:
+        merged, merged_tokenizer = merge_adapter()
+    return _save_with_identity(merged, merged_tokenizer, output_dir)
+
+
+def _ort_model_class():
+    # Optional dependency, only needed for the onnx backend
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise RuntimeError("The onnx backend needs `pip install optimum[onnxruntime]`") from e
+    return ORTModelForSeq2SeqLM
+
+
+def ort_session_options(threads: int = TORCH_THREADS, interop_threads: int = TORCH_INTEROP_THREADS):
+    # ONNX Runtime keeps its own thread pools; size them like torch's
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = interop_threads
+    return options
+
+
+def export_onnx_model(output_dir: str = ONNX_MODEL_DIR) -> str:
+    """Export the merged checkpoint to an ONNX Runtime seq2seq graph."""
+    ORTModelForSeq2SeqLM = _ort_model_class()
+    if not _is_current(MERGED_MODEL_DIR, model_identity(MODEL_DIR, BASE_MODEL)):
+        export_merged_model()
+    exported = ORTModelForSeq2SeqLM.from_pretrained(MERGED_MODEL_DIR, export=True)
+    return _save_with_identity(exported, T5Tokenizer.from_pretrained(MERGED_MODEL_DIR), output_dir)
+
+
+def build_model(
+    backend: str = INFERENCE_BACKEND,
+    use_merged: bool = True,
+    threads: int = TORCH_THREADS,
+    interop_threads: int = TORCH_INTEROP_THREADS,
+):
+    """Return ``(model, tokenizer, source)`` for one inference backend.
+
+    Every backend starts from the same merged weights, so switching backends
+    changes numerics and speed but never the fine-tuned adapter. ``threads``
+    only matters for onnx; torch backends follow ``configure_threads``.
+    """
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend {backend!r}; expected one of {INFERENCE_BACKENDS}")
+
+    identity = model_identity(MODEL_DIR, BASE_MODEL)
+    if backend == "onnx":
+        ORTModelForSeq2SeqLM = _ort_model_class()
+        if not _is_current(ONNX_MODEL_DIR, identity):
+            export_onnx_model()
+        built = ORTModelForSeq2SeqLM.from_pretrained(
+            ONNX_MODEL_DIR, session_options=ort_session_options(threads, interop_threads)
+        )
+        return built, T5Tokenizer.from_pretrained(ONNX_MODEL_DIR), "onnx"
+
+    if use_merged and _is_current(MERGED_MODEL_DIR, identity):
+        built = T5ForConditionalGeneration.from_pretrained(MERGED_MODEL_DIR)
+        built_tokenizer = T5Tokenizer.from_pretrained(MERGED_MODEL_DIR)
+        source = "merged"
+    else:
+        built, built_tokenizer = merge_adapter()
+        source = "adapter"
+        if use_merged:
+            # One-time export; failure to write it must not block serving
+            try:
+                export_merged_model(built, built_tokenizer)
+            except OSError as e:
+                print(f"⚠️ Could not export merged model: {e}")
+    built.eval()
+
+    if backend == "int8":
+        built = torch.ao.quantization.quantize_dynamic(built, {torch.nn.Linear}, dtype=torch.qint8)
+        source += "+int8"
+    return built, built_tokenizer, source
+
+
+def configure_threads(threads: int = TORCH_THREADS, interop_threads: int = TORCH_INTEROP_THREADS) -> None:
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(interop_threads)
+    except RuntimeError:
+        # Only settable once, before any inter-op work has started
+        pass
+    _status.update(torch_threads=torch.get_num_threads())
+
+
+def warmup() -> float:
+    # One short generation so the first real request doesn't pay for lazy kernel setup
+    start = time.perf_counter()
+    input_ids = tokenizer(WARMUP_DESCRIPTION, return_tensors="pt").input_ids
+    model.generate(input_ids=input_ids, max_new_tokens=8)
+    return time.perf_counter() - start
+
+
+def load_model(use_merged: bool = True, backend: str = INFERENCE_BACKEND, threads: int = TORCH_THREADS) -> None:
+    """Load the model once; concurrent callers wait for the same load."""
+    global model, tokenizer
+    with _load_lock:
+        if _status["state"] == "ready":
+            return
+        _status.update(state="loading", backend=backend, error=None)
+        start = time.perf_counter()
+        try:
+            configure_threads(threads)
+            model, tokenizer, source = build_model(backend, use_merged, threads)
+            _status.update(source=source, load_seconds=round(time.perf_counter() - start, 3))
+            _status.update(warmup_seconds=round(warmup(), 3), state="ready")
+        except Exception as e:
+            _status.update(state="failed", error=str(e))
+            raise
+
+
+def start_background_load() -> None:
+    global _loader
+    if _status["state"] == "ready" or (_loader is not None and _loader.is_alive()):
+        return
+
+    def run():
+        try:
+            load_model()
+        except Exception as e:
+            print(f"⚠️ Model load failed: {e}")
+
+    _loader = threading.Thread(target=run, name="model-loader", daemon=True)
+    _loader.start()
+
+
+def is_ready() -> bool:
+    return _status["state"] == "ready"
+
+
+def model_status() -> Dict[str, Any]:
+    return dict(_status)
+
+
+def get_model():
+    if not is_ready():
+        load_model()
+    return model, tokenizer
+
+def observe_generated(outputs, pad_token_id: int, mode: str) -> None:
+    # Output rows start with the decoder start (pad) token and are right-padded to the longest
+    for count in (outputs != pad_token_id).sum(dim=1).tolist():
+        TOKENS_GENERATED.observe(count, mode=mode)
 
 # Inference
 def generate_campaign_prediction(description: str, max_tokens: int = 128):
-    input_ids = tokenizer(description, return_tensors="pt").input_ids
-    outputs = model.generate(input_ids=input_ids, max_new_tokens=max_tokens)
-    result = tokenizer.decode(outputs[0], skip_special_tokens=True)
+    model, tokenizer = get_model()
+    with stage("tokenize"):
+        input_ids = tokenizer(description, return_tensors="pt").input_ids
+    with stage("generate"):
+        outputs = model.generate(input_ids=input_ids, max_new_tokens=max_tokens)
+    observe_generated(outputs, tokenizer.pad_token_id, "single")
+    with stage("decode"):
+        result = tokenizer.decode(outputs[0], skip_special_tokens=True)
     return result
+
+# Batched inference: pads the descriptions and generates them in one forward pass
+def generate_campaign_predictions(descriptions: List[str], max_tokens: int = 128) -> List[str]:
+    model, tokenizer = get_model()
+    with stage("tokenize"):
+        inputs = tokenizer(descriptions, return_tensors="pt", padding=True)
+    with stage("generate"):
+        outputs = model.generate(
+            input_ids=inputs.input_ids,
+            attention_mask=inputs.attention_mask,
+            max_new_tokens=max_tokens,
+        )
+    observe_generated(outputs, tokenizer.pad_token_id, "batch")
+    with stage("decode"):
+        return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+class CancelledCriteria(StoppingCriteria):
+    # Lets a streaming caller stop generate() at the next token
+    def __init__(self, cancel: threading.Event):
+        self.cancel = cancel
+
+    def __call__(self, input_ids, scores, **kwargs) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.cancel.is_set(), dtype=torch.bool)
+
+# Streaming inference: yields decoded text pieces as generate() produces tokens, without
+# blocking the event loop. With ``slots`` (the executor's semaphore) generation waits for
+# a free slot; ``timeout`` bounds the whole stream, including that wait.
+async def stream_campaign_prediction(
+    description: str,
+    max_tokens: int = 128,
+    cancel: Optional[threading.Event] = None,
+    slots: Optional[threading.Semaphore] = None,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[str]:
+    model, tokenizer = get_model()
+    cancel = cancel or threading.Event()
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    streamer = AsyncTextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    with stage("tokenize"):
+        input_ids = tokenizer(description, return_tensors="pt").input_ids
+    errors = []
+
+    def run():
+        try:
+            waiting = time.perf_counter()
+            if slots is not None and not slots.acquire(timeout=timeout):
+                raise DeadlineExceeded("No inference slot became free before the deadline")
+            QUEUE_WAIT_SECONDS.observe(time.perf_counter() - waiting)
+            try:
+                if not cancel.is_set():
+                    # Includes the streamer's incremental decoding, which runs inside generate()
+                    with stage("generate_stream"):
+                        outputs = model.generate(
+                            input_ids=input_ids,
+                            max_new_tokens=max_tokens,
+                            streamer=streamer,
+                            stopping_criteria=StoppingCriteriaList([CancelledCriteria(cancel)]),
+                        )
+                    observe_generated(outputs, tokenizer.pad_token_id, "stream")
+            finally:
+                if slots is not None:
+                    slots.release()
+        except Exception as e:
+            # Unblock the consumer; the error is re-raised on its side
+            errors.append(e)
+            streamer.end()
+
+    threading.Thread(target=run, name="prediction-stream", daemon=True).start()
+    try:
+        while True:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceeded("Prediction did not finish before its deadline")
+            try:
+                text = await asyncio.wait_for(streamer.__anext__(), remaining)
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded("Prediction did not finish before its deadline")
+            if text:
+                yield text
+        if errors:
+            raise errors[0]
+    finally:
+        # Leaving early (client gone, deadline) stops generate() at the next token,
+        # which also frees its inference slot
+        cancel.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the merged FLAN-T5 + LoRA checkpoint")
+    parser.add_argument("--output", default=MERGED_MODEL_DIR)
+    parser.add_argument("--onnx", action="store_true", help="Also export the ONNX Runtime graph")
+    args = parser.parse_args()
+
+    print("🔧 Merging LoRA adapter into the base model...")
+    print(f"✅ Merged checkpoint written to {export_merged_model(output_dir=args.output)}")
+    if args.onnx:
+        print(f"✅ ONNX graph written to {export_onnx_model()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from models.batch_score import read_descriptions
+from models.parsing import parse_prediction
+from telemetry.metrics import percentile
+
+
+def rss_mib() -> float:
+    # Resident set size of this process (Linux); 0 where /proc is unavailable
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def run_backend(backend: str, descriptions: List[str], max_tokens: int) -> Dict[str, Any]:
+    # Runs in its own process so load time and memory are measured in isolation
+    from models import inference
+
+    before = rss_mib()
+    inference.load_model(backend=backend)
+    loaded = rss_mib()
+
+    predictions, latencies = [], []
+    for description in descriptions:
+        start = time.perf_counter()
+        predictions.append(inference.generate_campaign_prediction(description, max_tokens))
+        latencies.append(time.perf_counter() - start)
+
+    status = inference.model_status()
+    return {
+        "backend": backend,
+        "source": status["source"],
+        "load_seconds": status["load_seconds"],
+        "model_rss_mib": round(loaded - before, 1),
+        "rss_mib": round(rss_mib(), 1),
+        "latencies": latencies,
+        "predictions": predictions,
+    }
+
+
+def drift(reference: List[str], candidate: List[str]) -> Dict[str, Any]:
+    """How far parsed fields move from the fp32 reference, per description."""
+    roi_diffs, conversion_diffs = [], []
+    label_matches = label_total = parse_failures = exact = 0
+    for ref_text, text in zip(reference, candidate):
+        ref, out = parse_prediction(ref_text), parse_prediction(text)
+        exact += ref_text == text
+        if out["predicted_roi"] is None or out["predicted_conversion_rate"] is None or out["success_probability"] is None:
+            parse_failures += 1
+        if ref["predicted_roi"] is not None and out["predicted_roi"] is not None:
+            roi_diffs.append(abs(ref["predicted_roi"] - out["predicted_roi"]))
+        if ref["predicted_conversion_rate"] is not None and out["predicted_conversion_rate"] is not None:
+            conversion_diffs.append(abs(ref["predicted_conversion_rate"] - out["predicted_conversion_rate"]))
+        if ref["success_probability"] is not None:
+            label_total += 1
+            label_matches += ref["success_probability"] == out["success_probability"]
+
+    n = len(reference)
+    return {
+        "exact_text_match": round(exact / n, 4) if n else None,
+        "roi_mean_abs_diff": round(statistics.mean(roi_diffs), 4) if roi_diffs else None,
+        "roi_max_abs_diff": round(max(roi_diffs), 4) if roi_diffs else None,
+        "conversion_mean_abs_diff": round(statistics.mean(conversion_diffs), 6) if conversion_diffs else None,
+        "success_label_agreement": round(label_matches / label_total, 4) if label_total else None,
+        "parse_failure_rate": round(parse_failures / n, 4) if n else None,
+    }
+
+
+def measure(backend: str, input_path: str, limit: int, max_tokens: int) -> Dict[str, Any]:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        result_path = f.name
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "models.parity_harness", input_path, "--child", backend,
+             "--limit", str(limit), "--max-tokens", str(max_tokens), "--output", result_path],
+            check=True,
+        )
+        with open(result_path) as f:
+            return json.load(f)
+    finally:
+        os.unlink(result_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency, memory and output drift of each inference backend vs fp32")
+    parser.add_argument("input", help="Held-out CSV or JSONL of campaign descriptions")
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"])
+    parser.add_argument("--column", default="Campaign_Description")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--output", help="Write the full report (JSON) here")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    descriptions = read_descriptions(args.input, args.column)[:args.limit]
+    if args.child:
+        with open(args.output, "w") as f:
+            json.dump(run_backend(args.child, descriptions, args.max_tokens), f)
+        return
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    runs = {b: measure(b, args.input, args.limit, args.max_tokens) for b in backends}
+    reference = runs["torch"]["predictions"]
+
+    report = []
+    print(f"{'backend':<8}{'p50 ms':>8}{'p95 ms':>8}{'model MiB':>11}{'exact':>7}{'ROI MAD':>9}{'conv MAD':>10}{'label agr':>11}{'parse fail':>12}")
+    for backend, run in runs.items():
+        row = {
+            "backend": backend,
+            "source": run["source"],
+            "load_seconds": run["load_seconds"],
+            "p50_ms": round(percentile(run["latencies"], 50) * 1000, 1),
+            "p95_ms": round(percentile(run["latencies"], 95) * 1000, 1),
+            "mean_ms": round(statistics.mean(run["latencies"]) * 1000, 1),
+            "model_rss_mib": run["model_rss_mib"],
+            "rss_mib": run["rss_mib"],
+            **drift(reference, run["predictions"]),
+        }
+        report.append(row)
+        print(
+            f"{backend:<8}{row['p50_ms']:>8.0f}{row['p95_ms']:>8.0f}{row['model_rss_mib']:>11.0f}"
+            f"{row['exact_text_match']:>7.2f}{str(row['roi_mean_abs_diff']):>9}{str(row['conversion_mean_abs_diff']):>10}"
+            f"{str(row['success_label_agreement']):>11}{row['parse_failure_rate']:>12.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"descriptions": len(descriptions), "max_tokens": args.max_tokens, "backends": report}, f, indent=2)
+        print(f"✅ Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import re
+from typing import Any, Dict, Optional
+
+# The fine-tuned model emits the completion format built in generate_finetune_jsonl.py;
+# decoding drops the newlines, so fields are matched by their labels
+_ROI = re.compile(r"Predicted ROI:\s*(-?\d+(?:\.\d+)?)", re.IGNORECASE)
+_CONVERSION = re.compile(r"Predicted Conversion Rate:\s*(-?\d+(?:\.\d+)?)", re.IGNORECASE)
+_SUCCESS = re.compile(r"Success Probability:\s*(Low|Medium|High)", re.IGNORECASE)
+_RECOMMENDATION = re.compile(r"Recommendation:\s*(.+)", re.IGNORECASE | re.DOTALL)
+
+
+def _number(pattern: re.Pattern, text: str) -> Optional[float]:
+    match = pattern.search(text)
+    return float(match.group(1)) if match else None
+
+
+def parse_prediction(text: str) -> Dict[str, Any]:
+    """Structured fields from a generated prediction; missing fields are None."""
+    success = _SUCCESS.search(text)
+    recommendation = _RECOMMENDATION.search(text)
+    return {
+        "predicted_roi": _number(_ROI, text),
+        "predicted_conversion_rate": _number(_CONVERSION, text),
+        "success_probability": success.group(1).capitalize() if success else None,
+        "recommendation": recommendation.group(1).strip() if recommendation else None,
+    }
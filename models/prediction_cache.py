@@ -0,0 +1,137 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# In-memory tier size and on-disk tier location (override with environment variables)
+PREDICTION_CACHE_SIZE = int(os.getenv("CAMPAIGNMIND_PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_PATH = os.getenv("CAMPAIGNMIND_PREDICTION_CACHE_PATH", "models/prediction_cache.sqlite3")
+
+# Disk entries older than this are evicted when a cache is opened (0 keeps them forever)
+PREDICTION_CACHE_MAX_AGE_DAYS = float(os.getenv("CAMPAIGNMIND_PREDICTION_CACHE_MAX_AGE_DAYS", "30"))
+
+_DASHES = re.compile(r"[‐-―−]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_description(description: str) -> str:
+    # Templates, copy-paste and retries differ only in case, dashes and whitespace
+    text = unicodedata.normalize("NFKC", description)
+    text = _DASHES.sub("-", text)
+    text = _SPACES.sub(" ", text).strip().casefold()
+    return text.rstrip(" .")
+
+
+def model_identity(model_dir: str, base_model: str, variant: str = "") -> str:
+    """Fingerprint of the base model name and every file in the adapter directory.
+
+    ``variant`` distinguishes numerically different builds of the same weights,
+    such as the int8 or ONNX inference backends.
+    """
+    digest = hashlib.sha1(base_model.encode())
+    if variant:
+        digest.update(f"\x00{variant}".encode())
+    if os.path.isdir(model_dir):
+        for name in sorted(os.listdir(model_dir)):
+            path = os.path.join(model_dir, name)
+            if not os.path.isfile(path):
+                continue
+            digest.update(name.encode())
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class PredictionCache:
+    """Two-tier cache of generated predictions: an LRU in memory over a SQLite file.
+
+    Keys combine the normalized description, ``max_tokens`` and the model
+    identity, so retraining or swapping the adapter invalidates it automatically.
+    Processes serving different models can share one file; entries of a model
+    no one serves any more age out after ``max_age_days``.
+    """
+
+    def __init__(self, identity: str, path: Optional[str] = PREDICTION_CACHE_PATH,
+                 max_entries: int = PREDICTION_CACHE_SIZE, max_age_days: float = PREDICTION_CACHE_MAX_AGE_DAYS):
+        self.identity = identity
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, prediction TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            if max_age_days > 0:
+                self._db.execute("DELETE FROM predictions WHERE created < ?", (time.time() - max_age_days * 86400,))
+            self._db.commit()
+
+    def key(self, description: str, max_tokens: int) -> str:
+        raw = f"{self.identity}\x00{max_tokens}\x00{normalize_description(description)}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, description: str, max_tokens: int) -> Optional[str]:
+        key = self.key(description, max_tokens)
+        with self._lock:
+            prediction = self._memory.get(key)
+            if prediction is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return prediction
+
+            if self._db is not None:
+                row = self._db.execute("SELECT prediction FROM predictions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._remember(key, row[0])
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, description: str, max_tokens: int, prediction: str) -> None:
+        key = self.key(description, max_tokens)
+        with self._lock:
+            self._remember(key, prediction)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions (key, model, prediction, created) VALUES (?, ?, ?, ?)",
+                    (key, self.identity, prediction, time.time()),
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, prediction: str) -> None:
+        self._memory[key] = prediction
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            disk_entries = None
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+            return {
+                "model_identity": self.identity,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else None,
+            }
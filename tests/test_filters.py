@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from backend.dataset import build_snapshot, load_data
+from backend.filters import BREAKDOWN_KEYS, build_selection, cube_response, rows_response
+from benchmarks.synthetic_data import generate_campaigns
+
+SELECTIONS = [
+    {},
+    {"channel": ["Facebook"]},
+    {"location": ["Miami", "Austin"], "goal": "Increase Sales"},
+    {"channel": ["Instagram", "Twitter"], "quarter": ["2022Q2"], "audience": ["Women 18-24"]},
+]
+
+
+@pytest.fixture(scope="module")
+def blank_cells(tmp_path_factory):
+    # A CSV with some Location and Channel_Used cells left empty
+    df = generate_campaigns(5000, seed=5)
+    df.loc[df.index % 37 == 0, "Location"] = None
+    df.loc[df.index % 53 == 0, "Channel_Used"] = None
+    path = tmp_path_factory.mktemp("data") / "campaigns.csv"
+    df.to_csv(path, index=False)
+    loaded = load_data(str(path))
+    return loaded, build_snapshot(loaded, "test", 0.0, 0)
+
+
+@pytest.mark.parametrize("filters", SELECTIONS)
+def test_blank_group_values_match_rows_engine(blank_cells, filters):
+    _, snapshot = blank_cells
+    selection = build_selection(**filters)
+    assert cube_response(snapshot, selection) == rows_response(snapshot, selection)
+    assert cube_response(snapshot, selection, BREAKDOWN_KEYS) == rows_response(snapshot, selection, BREAKDOWN_KEYS)
+
+
+def test_blank_group_values_count_in_kpis_not_breakdowns(blank_cells):
+    df, snapshot = blank_cells
+    response = cube_response(snapshot, {}, BREAKDOWN_KEYS)
+    assert response["average_roi"] == float(np.round(df["ROI"].mean(), 2))
+    expected = df.groupby("Location", observed=True)["ROI"].mean().round(2).to_dict()
+    assert response["roi_by_location"] == expected
+    assert set(response["distributions"]["roi_by_location"]["groups"]) == set(expected)
+    counts = df.groupby("Channel_Used", observed=True).size().to_dict()
+    groups = response["distributions"]["roi_by_channel"]["groups"]
+    assert {channel: group["count"] for channel, group in groups.items()} == counts
+
+
+def test_distributions_only_when_asked_for(blank_cells):
+    _, snapshot = blank_cells
+    selection = build_selection(channel=["Facebook"])
+    assert "distributions" not in cube_response(snapshot, selection)
+    response = cube_response(snapshot, selection, ["engagement_by_location"])
+    assert list(response["distributions"]) == ["engagement_by_location"]
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.cache import encode_response
+from backend.columnar import write_columnar
+from backend.dataset import DatasetStore, load_data
+from backend.filters import BREAKDOWN_KEYS, build_selection, cube_response, rows_response
+from benchmarks.synthetic_data import generate_campaigns
+
+SELECTIONS = [
+    {},
+    {"channel": ["Facebook"]},
+    {"location": ["Miami", "Chicago"], "goal": "Increase Sales"},
+    {"quarter": ["2022Q2"], "audience": ["Women 18-24"]},
+]
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "campaigns.csv"
+    generate_campaigns(4000, seed=1).to_csv(path, index=False)
+    return str(path)
+
+
+def new_rows(n, seed):
+    # Values outside the loaded ROI range, so fixed sketch bins would show
+    rows = generate_campaigns(n, seed=seed)
+    rows["ROI"] = rows["ROI"] + 5
+    return rows.astype(str)
+
+
+def mapped(values):
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = values.base
+    return False
+
+
+def bodies(snapshot):
+    return [
+        encode_response(engine(snapshot, build_selection(**filters), BREAKDOWN_KEYS)).body
+        for filters in SELECTIONS
+        for engine in (cube_response, rows_response)
+    ]
+
+
+def test_same_version_same_body_after_incremental_ingest(data_file, tmp_path):
+    # A worker that appended the rows and one that loaded them from the log
+    # serve the same version, so their bodies (and ETags) must match
+    log_dir = str(tmp_path / "ingest")
+    store = DatasetStore(data_file, log_dir=log_dir, compact_rows=0)
+    store.get()
+    store.ingest(new_rows(300, seed=2))
+    incremental = store.ingest(new_rows(200, seed=3))
+
+    fresh = DatasetStore(data_file, log_dir=log_dir, compact_rows=0).get()
+    assert fresh.version == incremental.version
+    assert bodies(fresh) == bodies(incremental)
+
+    query = "30-day instagram campaign for product launch in miami"
+    for a, b in zip(fresh.retrieval.search(query, 20), incremental.retrieval.search(query, 20)):
+        np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_compacted_ingest_matches_full_reload(data_file, tmp_path, columnar):
+    batches = [new_rows(300, seed=2), new_rows(200, seed=3)]
+    combined = tmp_path / "combined.csv"
+    pd.concat([pd.read_csv(data_file, dtype=str, keep_default_na=False)] + batches).to_csv(combined, index=False)
+    expected = bodies(DatasetStore(str(combined), log_dir=str(tmp_path / "unused")).get())
+
+    path = data_file
+    if columnar:
+        path = str(tmp_path / "campaigns.columns")
+        write_columnar(load_data(data_file), path, version="base")
+    store = DatasetStore(path, log_dir=str(tmp_path / "ingest"), compact_rows=0)
+    loaded = store.get().df
+    for rows in batches:
+        snapshot = store.ingest(rows)
+    # Appends leave the loaded (possibly memory-mapped) frame alone
+    assert snapshot.df is loaded
+    assert snapshot.n_rows == len(loaded) + 500
+    rows = np.array([snapshot.n_rows - 1, 0, len(loaded), 5, len(loaded) - 1])
+    pd.testing.assert_frame_equal(snapshot.take(rows), snapshot.take().iloc[rows].reset_index(drop=True))
+
+    assert store.compact()
+    assert bodies(store.get()) == expected
+
+
+def test_fresh_worker_replays_log_without_copying_the_mapped_frame(data_file, tmp_path):
+    path = str(tmp_path / "campaigns.columns")
+    write_columnar(load_data(data_file), path, version="base")
+    log_dir = str(tmp_path / "ingest")
+    store = DatasetStore(path, log_dir=log_dir, compact_rows=0)
+    store.get()
+    store.ingest(new_rows(300, seed=2))
+    rows = new_rows(200, seed=3)
+    rows.loc[::7, "Location"] = "Reykjavik"
+    incremental = store.ingest(rows)
+
+    fresh = DatasetStore(path, log_dir=log_dir, compact_rows=0).get()
+    assert fresh.version == incremental.version
+    assert bodies(fresh) == bodies(incremental)
+    # Logged rows live in append buffers; the loaded columns are still the mapped files
+    assert len(fresh.appended) == 500
+    for snapshot in (fresh, incremental):
+        assert mapped(snapshot.df["ROI"].to_numpy())
+        assert mapped(snapshot.df["Location"].array.codes)
+    assert fresh.take(columns=["Location"])["Location"].value_counts()["Reykjavik"] == 29